@@ -1,6 +1,6 @@
 #!/bin/bash
 
-# Script to create just the lists scheduler without full redeployment
+# Script to create just the daily lists and tasks scheduler without full redeployment
 # Useful for updating existing deployments
 
 set -e
@@ -10,48 +10,53 @@ PROJECT_ID="nettsmed-internal"
 SCHEDULER_REGION="europe-west1"
 SERVICE_URL="https://clickup-bigquery-sync-b3fljnwepq-lz.a.run.app"
 
-echo "🕐 Creating ClickUp Lists Daily Scheduler"
+echo "🕐 Creating ClickUp Lists and Tasks Daily Scheduler"
 echo "=================================================="
 
 # Set project
 gcloud config set project $PROJECT_ID
 
 # Create scheduler
-echo "Creating lists sync scheduler (daily at 3 AM Oslo time)..."
-gcloud scheduler jobs create http clickup-lists-sync-daily \
+echo "Creating lists and tasks sync scheduler (daily at 3:30 AM Oslo time)..."
+gcloud scheduler jobs create http clickup-daily-sync \
     --location=$SCHEDULER_REGION \
-    --schedule="0 3 * * *" \
-    --uri="${SERVICE_URL}/sync/lists" \
+    --schedule="30 3 * * *" \
+    --uri="${SERVICE_URL}/sync/daily" \
     --http-method=POST \
     --oidc-service-account-email=clickup-scheduler@${PROJECT_ID}.iam.gserviceaccount.com \
     --time-zone="Europe/Oslo" \
-    --description="Sync ClickUp lists daily at 3 AM" \
+    --description="Sync ClickUp lists, then tasks, daily at 3:30 AM" \
     2>/dev/null || echo "✓ Scheduler already exists, updating..."
 
 # If it already exists, update it
 if [ $? -ne 0 ]; then
     echo "Updating existing scheduler..."
-    gcloud scheduler jobs update http clickup-lists-sync-daily \
+    gcloud scheduler jobs update http clickup-daily-sync \
         --location=$SCHEDULER_REGION \
-        --schedule="0 3 * * *" \
-        --uri="${SERVICE_URL}/sync/lists" \
+        --schedule="30 3 * * *" \
+        --uri="${SERVICE_URL}/sync/daily" \
         --http-method=POST \
         --oidc-service-account-email=clickup-scheduler@${PROJECT_ID}.iam.gserviceaccount.com \
         --time-zone="Europe/Oslo" \
-        --description="Sync ClickUp lists daily at 3 AM"
+        --description="Sync ClickUp lists, then tasks, daily at 3:30 AM"
 fi
 
+# Replaced by clickup-daily-sync
+for job in clickup-lists-sync-daily clickup-tasks-sync-daily; do
+    gcloud scheduler jobs delete $job --location=$SCHEDULER_REGION --quiet 2>/dev/null || true
+done
+
 echo ""
-echo "✅ Lists scheduler created/updated!"
+echo "✅ Lists and tasks scheduler created/updated!"
 echo ""
 echo "Scheduler details:"
-echo "  - Name: clickup-lists-sync-daily"
-echo "  - Schedule: Daily at 3:00 AM Oslo time (0 3 * * *)"
-echo "  - Endpoint: ${SERVICE_URL}/sync/lists"
+echo "  - Name: clickup-daily-sync"
+echo "  - Schedule: Daily at 3:30 AM Oslo time (30 3 * * *)"
+echo "  - Endpoint: ${SERVICE_URL}/sync/daily"
 echo "  - Region: $SCHEDULER_REGION"
 echo ""
 echo "📊 Test the scheduler:"
-echo "  gcloud scheduler jobs run clickup-lists-sync-daily --location=$SCHEDULER_REGION"
+echo "  gcloud scheduler jobs run clickup-daily-sync --location=$SCHEDULER_REGION"
 echo ""
 echo "📋 List all schedulers:"
 echo "  gcloud scheduler jobs list --location=$SCHEDULER_REGION"
@@ -87,29 +87,22 @@ gcloud scheduler jobs create http clickup-full-reindex-quarterly \
     --description="Full reindex of all ClickUp data (quarterly at 2 AM on 1st)" \
     2>/dev/null || echo "  ✓ Full reindex scheduler already exists"
 
-# Scheduler 3: Daily lists sync
-echo "  Creating lists sync scheduler (daily)..."
-gcloud scheduler jobs create http clickup-lists-sync-daily \
+# Scheduler 3: Daily lists + tasks sync (one hierarchy walk for both)
+echo "  Creating lists and tasks sync scheduler (daily)..."
+gcloud scheduler jobs create http clickup-daily-sync \
     --location=$SCHEDULER_REGION \
-    --schedule="0 3 * * *" \
-    --uri="${SERVICE_URL}/sync/lists" \
+    --schedule="30 3 * * *" \
+    --uri="${SERVICE_URL}/sync/daily" \
     --http-method=POST \
     --oidc-service-account-email=clickup-scheduler@${PROJECT_ID}.iam.gserviceaccount.com \
     --time-zone="Europe/Oslo" \
-    --description="Sync ClickUp lists daily at 3 AM" \
-    2>/dev/null || echo "  ✓ Lists sync scheduler already exists"
+    --description="Sync ClickUp lists, then tasks, daily at 3:30 AM" \
+    2>/dev/null || echo "  ✓ Daily sync scheduler already exists"
 
-# Scheduler 4: Daily tasks sync
-echo "  Creating tasks sync scheduler (daily)..."
-gcloud scheduler jobs create http clickup-tasks-sync-daily \
-    --location=$SCHEDULER_REGION \
-    --schedule="0 4 * * *" \
-    --uri="${SERVICE_URL}/sync/tasks" \
-    --http-method=POST \
-    --oidc-service-account-email=clickup-scheduler@${PROJECT_ID}.iam.gserviceaccount.com \
-    --time-zone="Europe/Oslo" \
-    --description="Sync ClickUp tasks daily at 4 AM" \
-    2>/dev/null || echo "  ✓ Tasks sync scheduler already exists"
+# Replaced by clickup-daily-sync; remove them from existing deployments
+for job in clickup-lists-sync-daily clickup-tasks-sync-daily; do
+    gcloud scheduler jobs delete $job --location=$SCHEDULER_REGION --quiet 2>/dev/null || true
+done
 
 # Scheduler 5: Daily accounts sync
 echo "  Creating accounts sync scheduler (daily)..."
@@ -143,6 +136,7 @@ echo ""
 echo "Endpoints:"
 echo "  - POST $SERVICE_URL/sync/refresh"
 echo "  - POST $SERVICE_URL/sync/full_reindex"
+echo "  - POST $SERVICE_URL/sync/daily"
 echo "  - POST $SERVICE_URL/sync/lists"
 echo "  - POST $SERVICE_URL/sync/tasks"
 echo "  - POST $SERVICE_URL/sync/accounts"
@@ -152,15 +146,13 @@ echo ""
 echo "Schedulers:"
 echo "  - Every 6 hours: clickup-refresh-6h"
 echo "  - Quarterly (Jan/Apr/Jul/Oct 1st at 2 AM): clickup-full-reindex-quarterly"
-echo "  - Daily at 3 AM: clickup-lists-sync-daily"
-echo "  - Daily at 4 AM: clickup-tasks-sync-daily"
+echo "  - Daily at 3:30 AM: clickup-daily-sync (lists, then tasks)"
 echo "  - Daily at 5 AM: clickup-accounts-sync-daily"
 echo "  - Daily at 6 AM: clickup-apps-sync-daily"
 echo ""
 echo "📊 Test the service:"
 echo "  gcloud scheduler jobs run clickup-refresh-6h --location=$SCHEDULER_REGION"
-echo "  gcloud scheduler jobs run clickup-lists-sync-daily --location=$SCHEDULER_REGION"
-echo "  gcloud scheduler jobs run clickup-tasks-sync-daily --location=$SCHEDULER_REGION"
+echo "  gcloud scheduler jobs run clickup-daily-sync --location=$SCHEDULER_REGION"
 echo "  gcloud scheduler jobs run clickup-accounts-sync-daily --location=$SCHEDULER_REGION"
 echo "  gcloud scheduler jobs run clickup-apps-sync-daily --location=$SCHEDULER_REGION"
 echo ""
@@ -12,20 +12,37 @@ Usage:
 
 import argparse
 import os
+import shutil
+import sqlite3
 import sys
+import tempfile
+import threading
 import time
+import uuid
 import hashlib
 import logging
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Optional, Tuple
 from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
 
-import pandas as pd
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    # pandas/pyarrow are imported lazily in the DataFrame/upload paths to keep startup cheap
+    import pandas as pd
+    import pyarrow as pa
+
 # Load environment variables
 load_dotenv()
 
@@ -36,53 +53,319 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rows per Parquet row group for files sent to BigQuery load jobs
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Pipeline settings, read once from the environment (and .env) at startup."""
+    
+    clickup_token: Optional[str]
+    team_id: Optional[str]
+    assignees: Tuple[str, ...]
+    space_id: str
+    project_id: str
+    dataset: str
+    staging_table: str
+    fact_table: str
+    lists_table: str
+    tasks_table: str
+    accounts_table: str
+    apps_table: str
+    accounts_list_id: str
+    connected_cf_id: str
+    hours_discount_cf_id: str
+    arr_cf_id: str
+    last_updated_cf_id: str
+    maintenance_cf_id: str
+    accounts_rel_cf_id: str
+    backup_format: str
+    backup_dir: str
+    cache_path: Optional[str]
+    gcs_bucket: Optional[str]
+    state_bucket: Optional[str]
+    
+    @classmethod
+    def from_env(cls) -> 'Config':
+        """Build a Config from environment variables, applying the defaults."""
+        assignees_str = os.getenv('ASSIGNEES', '')
+        return cls(
+            clickup_token=os.getenv('CLICKUP_TOKEN'),
+            team_id=os.getenv('TEAM_ID'),
+            assignees=tuple(a.strip() for a in assignees_str.split(',') if a.strip()),
+            space_id=os.getenv('SPACE_ID', '61463579'),  # Billable work space
+            project_id=os.getenv('PROJECT_ID', 'nettsmed-internal'),
+            dataset=os.getenv('DATASET', 'clickup_data'),
+            staging_table=os.getenv('STAGING_TABLE', 'staging_time_entries'),
+            fact_table=os.getenv('FACT_TABLE', 'fact_time_entries'),
+            lists_table=os.getenv('LISTS_TABLE', 'dim_lists'),
+            tasks_table=os.getenv('TASKS_TABLE', 'dim_tasks'),
+            accounts_table=os.getenv('ACCOUNTS_TABLE', 'dim_accounts'),
+            apps_table=os.getenv('APPS_TABLE', 'dim_apps'),
+            accounts_list_id=os.getenv('ACCOUNTS_LIST_ID', '901506402026'),
+            connected_cf_id=os.getenv('CONNECTED_CF_ID', '00aeeab8-926e-4c46-8299-99f973287b6e'),
+            hours_discount_cf_id=os.getenv('HOURS_DISCOUNT_CF_ID', '2617cb32-785f-48ba-974a-1468c66e9166'),
+            arr_cf_id=os.getenv('ARR_CF_ID', '93ed8859-06ad-4909-938c-70b6f4c8352a'),
+            last_updated_cf_id=os.getenv('LAST_UPDATED_CF_ID', '203398a3-0a22-47b2-9ab9-8b838032f58e'),
+            maintenance_cf_id=os.getenv('MAINTENANCE_CF_ID', '1a9472e3-46e0-4cd3-88c5-587efaab0320'),
+            accounts_rel_cf_id=os.getenv('ACCOUNTS_REL_CF_ID', '9ac424ac-f78f-47ab-89c0-9b5540fee5c5'),
+            backup_format=os.getenv('BACKUP_FORMAT', 'parquet'),
+            backup_dir=os.getenv('BACKUP_DIR', '.'),
+            cache_path=os.getenv('CACHE_PATH') or None,
+            gcs_bucket=os.getenv('GCS_BUCKET') or None,
+            state_bucket=os.getenv('SYNC_STATE_BUCKET') or None,
+        )
+
+
+OSLO_TZ = ZoneInfo('Europe/Oslo')
+
+
+def ms_to_utc(ms: int) -> datetime:
+    """Convert ClickUp epoch milliseconds to an aware UTC datetime."""
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+BACKUP_FORMATS = ('none', 'csv', 'parquet')
+
+
+def backup_filename(prefix: str, backup_format: str, backup_dir: str) -> Optional[str]:
+    """Return a timestamped backup path under backup_dir, or None when backups are off."""
+    if backup_format == 'none':
+        return None
+    
+    os.makedirs(backup_dir, exist_ok=True)
+    extension = 'csv.gz' if backup_format == 'csv' else 'parquet'
+    return os.path.join(backup_dir, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}")
+
+
+def save_backup(df: 'pd.DataFrame', prefix: str, backup_format: str, backup_dir: str) -> Optional[str]:
+    """Write a backup of a DataFrame as gzip CSV or snappy Parquet; returns the path written."""
+    path = backup_filename(prefix, backup_format, backup_dir)
+    if path is None:
+        return None
+    
+    if backup_format == 'csv':
+        df.to_csv(path, index=False, compression='gzip')
+    else:
+        df.to_parquet(path, compression='snappy', index=False)
+    return path
 
-class ClickUpDataFetcher:
+
+# Exponential backoff (1s, 2s, 4s, ...) with up to 0.5s of jitter on rate limits,
+# server errors and dropped connections, so parallel chunk requests don't retry
+# in lockstep; Retry-After from a 429/503 is honoured when ClickUp sends it
+CLICKUP_RETRY = Retry(
+    total=5,
+    backoff_factor=1,
+    backoff_jitter=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+    allowed_methods=frozenset(['GET'])
+)
+
+# ClickUp's rate limit is per token, shared by every fetcher and thread in the
+# process; capping requests in flight keeps concurrent syncs (and their thread
+# pools) from tipping into 429/Retry-After stalls
+CLICKUP_MAX_IN_FLIGHT = 5
+_clickup_in_flight = threading.BoundedSemaphore(CLICKUP_MAX_IN_FLIGHT)
+
+
+def new_clickup_session() -> requests.Session:
+    """Create a pooled, retrying HTTP session for api.clickup.com that fetchers can share."""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=CLICKUP_RETRY))
+    session.headers['Content-Type'] = 'application/json'
+    return session
+
+
+class HierarchyCache:
+    """
+    In-memory cache of ClickUp folder and list responses.
+    
+    The lists and tasks syncs walk the same Space → Folder → List tree, so a
+    run within the TTL of another reuses its responses instead of re-fetching
+    them. Entries expire per key; the cache is shared by all fetcher threads.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+    
+    def set(self, key: Any, value: Any, ttl: float):
+        """Store a value for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+    
+    def clear(self) -> int:
+        """Drop every entry and return how many there were."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+
+# Folders change rarely; lists are added and renamed more often
+FOLDER_CACHE_TTL = 3600
+LIST_CACHE_TTL = 900
+HIERARCHY_CACHE = HierarchyCache()
+
+
+class _ClickUpBase:
+    """Shared HTTP plumbing for the ClickUp fetchers."""
+    
+    base_url = "https://api.clickup.com/api/v2"
+    
+    def __init__(self, authorization: str, session: Optional[requests.Session] = None):
+        # Persistent session so every call reuses pooled keep-alive connections to
+        # api.clickup.com; auth is sent per request so one session can serve all fetchers
+        self._owns_session = session is None
+        self.session = session or new_clickup_session()
+        self.headers = {'Authorization': authorization}
+        # Rate-limit budget reported by ClickUp on the last response (per token)
+        self._remaining: Optional[int] = None
+        self._reset_at: float = 0.0
+    
+    def close(self):
+        """Release pooled connections, unless the session was passed in."""
+        if self._owns_session:
+            self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _wait_for_rate_limit(self):
+        """Sleep until the rate-limit window resets if the last response said the budget is spent."""
+        if self._remaining is not None and self._remaining <= 1:
+            wait_time = self._reset_at - time.time()
+            if wait_time > 0:
+                logger.warning(f"Rate limit budget exhausted. Waiting {wait_time:.1f}s for reset")
+                time.sleep(wait_time)
+    
+    def _update_rate_limit(self, response: requests.Response):
+        """Record X-RateLimit-Remaining / X-RateLimit-Reset (epoch seconds) from a response."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_at = response.headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset_at is not None:
+            try:
+                self._remaining, self._reset_at = int(remaining), float(reset_at)
+            except ValueError:
+                pass
+    
+    def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Make an HTTP GET request.
+        
+        Throttling is reactive: requests pause only when ClickUp's rate-limit
+        headers say the budget is spent, and 429s honour Retry-After through
+        the session adapter, which also retries 5xx and connection errors.
+        At most CLICKUP_MAX_IN_FLIGHT requests run at once across the process.
+        """
+        self._wait_for_rate_limit()
+        try:
+            with _clickup_in_flight:
+                response = self.session.get(url, params=params, headers=self.headers, timeout=30)
+            self._update_rate_limit(response)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            # Not every failure was retried (a 4xx raises on the first try), so
+            # no attempt count here; exhausted retries show up in the error itself
+            logger.error(f"Request to {url} failed: {e}")
+            raise
+        # orjson parses the raw bytes directly, skipping the str decode of response.json()
+        return orjson.loads(response.content)
+    
+    def _make_cached_request(self, url: str, ttl: float) -> Dict[str, Any]:
+        """GET through HIERARCHY_CACHE; keyed by token too, since visibility differs per token."""
+        key = (self.headers['Authorization'], url)
+        data = HIERARCHY_CACHE.get(key)
+        if data is None:
+            data = self._make_request(url)
+            HIERARCHY_CACHE.set(key, data, ttl)
+        return data
+
+
+class ClickUpCache:
+    """
+    SQLite cache of time entry chunk responses.
+    
+    Keys are SHA-256 of (team, assignees, start_ms, end_ms); bodies are
+    zlib-compressed JSON. Freshness is decided at read time from the chunk's
+    end date, see ttl_for().
+    """
+    
+    def __init__(self, path: str):
+        # One connection shared by the fetch threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, fetched_at INTEGER NOT NULL, body BLOB NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def key(team_id: str, assignees: List[str], start_ms: int, end_ms: int) -> str:
+        """Cache key for one chunk request."""
+        return hashlib.sha256(f"{team_id}|{','.join(sorted(assignees))}|{start_ms}|{end_ms}".encode()).hexdigest()
+    
+    @staticmethod
+    def ttl_for(end_date: datetime, now: datetime) -> int:
+        """Seconds a chunk stays fresh: 7 days when older than a week, 60s within the week, 0 (never) for today."""
+        if end_date >= now.replace(hour=0, minute=0, second=0, microsecond=0):
+            return 0
+        if end_date >= now - timedelta(days=7):
+            return 60
+        return 7 * 24 * 3600
+    
+    def get(self, key: str, ttl: int) -> Optional[Any]:
+        """Return the cached value if it is younger than ttl seconds."""
+        if ttl <= 0:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at, body FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] > ttl:
+            return None
+        return orjson.loads(zlib.decompress(row[1]))
+    
+    def set(self, key: str, value: Any):
+        """Store a value, replacing any previous entry."""
+        body = zlib.compress(orjson.dumps(value))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache(key, fetched_at, body) VALUES (?, ?, ?)",
+                (key, int(time.time()), body)
+            )
+            self._conn.commit()
+    
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+
+class ClickUpDataFetcher(_ClickUpBase):
     """Fetches time entries from ClickUp API with robust error handling."""
     
-    def __init__(self, token: str, team_id: str, assignees: List[str]):
+    def __init__(self, token: str, team_id: str, assignees: List[str],
+                 session: Optional[requests.Session] = None, cache: Optional[ClickUpCache] = None):
+        super().__init__(f'Bearer {token}', session)
         self.token = token
         self.team_id = team_id
         self.assignees = assignees
-        self.base_url = "https://api.clickup.com/api/v2"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        })
-        
-    def _make_request(self, url: str, params: Dict[str, Any], max_retries: int = 3) -> Dict[str, Any]:
-        """Make HTTP request with exponential backoff retry logic."""
-        for attempt in range(max_retries + 1):
-            try:
-                response = self.session.get(url, params=params, timeout=30)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    # Rate limited - wait and retry
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limited. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code >= 500:
-                    # Server error - retry with backoff
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Server error {response.status_code}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    response.raise_for_status()
-                    
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries:
-                    logger.error(f"Request failed after {max_retries + 1} attempts: {e}")
-                    raise
-                wait_time = 2 ** attempt
-                logger.warning(f"Request failed: {e}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-        
-        raise Exception(f"Request failed after {max_retries + 1} attempts")
+        self.cache = cache
     
     def fetch_time_entries_30day_chunk(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Fetch time entries for a 30-day chunk respecting ClickUp's API limitations."""
@@ -103,14 +386,23 @@ class ClickUpDataFetcher:
         
         url = f"{self.base_url}/team/{self.team_id}/time_entries"
         
+        # Historical windows rarely change, so a cached response skips the API call
+        cache_key = cache_ttl = None
+        if self.cache is not None:
+            cache_key = ClickUpCache.key(self.team_id, self.assignees, start_ms, end_ms)
+            cache_ttl = ClickUpCache.ttl_for(end_date, datetime.now(timezone.utc))
+            entries = self.cache.get(cache_key, cache_ttl)
+            if entries is not None:
+                logger.info(f"Using cached entries for {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+                return entries
+        
         try:
             logger.info(f"Fetching time entries from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
             
-            # Add small delay between requests to respect rate limits
-            time.sleep(0.5)
-            
             data = self._make_request(url, params)
             entries = data.get('data', [])
+            if cache_ttl:
+                self.cache.set(cache_key, entries)
             
             logger.info(f"Found {len(entries)} entries for this chunk")
             all_entries.extend(entries)
@@ -121,77 +413,78 @@ class ClickUpDataFetcher:
         
         return all_entries
     
-    def fetch_all_time_entries(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
-        """Fetch all time entries using 30-day chunks."""
-        all_entries = []
-        current_start = start_date
+    def fetch_all_time_entries(self, start_date: datetime, end_date: datetime,
+                               max_workers: int = 6,
+                               progress_callback: Optional[Callable[[float], None]] = None
+                               ) -> List[Dict[str, Any]]:
+        """
+        Fetch all time entries using 30-day chunks, with up to `max_workers` chunks in flight.
         
+        The chunk requests are independent and bound on API round trips, so
+        they run on a thread pool over the shared session. Results are
+        collected in date order. `progress_callback`, if given, is called with
+        the fraction of chunks collected so far.
+        
+        Raises:
+            RuntimeError: If any chunk failed, once all chunks are done. The
+                entries feed a MERGE that deletes unmatched rows, so a partial
+                result must never be returned.
+        """
+        chunks = []
+        current_start = start_date
         while current_start < end_date:
             # Calculate chunk end (30 days from current start)
             chunk_end = min(current_start + timedelta(days=30), end_date)
+            chunks.append((current_start, chunk_end))
+            current_start = chunk_end
+        
+        # Latest version of each entry by 'at', deduplicated as chunks arrive
+        latest: Dict[Any, Dict[str, Any]] = {}
+        latest_at: Dict[Any, int] = {}
+        fetched = 0
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.fetch_time_entries_30day_chunk, chunk_start, chunk_end)
+                for chunk_start, chunk_end in chunks
+            ]
             
-            try:
-                chunk_entries = self.fetch_time_entries_30day_chunk(current_start, chunk_end)
-                all_entries.extend(chunk_entries)
-                
-                # Move to next chunk
-                current_start = chunk_end
+            for done, ((chunk_start, chunk_end), future) in enumerate(zip(chunks, futures), 1):
+                try:
+                    chunk_entries = future.result()
+                except Exception as e:
+                    chunk = f"{chunk_start.strftime('%Y-%m-%d')} to {chunk_end.strftime('%Y-%m-%d')}"
+                    logger.error(f"Failed to fetch chunk {chunk}: {e}")
+                    failed.append(chunk)
+                    continue
+                finally:
+                    if progress_callback is not None:
+                        progress_callback(done / len(chunks))
                 
-            except Exception as e:
-                logger.error(f"Failed to fetch chunk {current_start.strftime('%Y-%m-%d')} to {chunk_end.strftime('%Y-%m-%d')}: {e}")
-                # Continue with next chunk instead of failing completely
-                current_start = chunk_end
-                continue
-        
-        logger.info(f"Total entries fetched: {len(all_entries)}")
-        return all_entries
+                fetched += len(chunk_entries)
+                for entry in chunk_entries:
+                    entry_id = entry.get('id')
+                    at_ms = DataTransformer.safe_int(entry.get('at')) or 0
+                    if entry_id not in latest or at_ms > latest_at[entry_id]:
+                        latest[entry_id] = entry
+                        latest_at[entry_id] = at_ms
+        
+        if failed:
+            raise RuntimeError(f"Failed to fetch {len(failed)} of {len(chunks)} time entry chunks: {', '.join(failed)}")
+        
+        logger.info(f"Total entries fetched: {fetched}")
+        if len(latest) < fetched:
+            logger.info(f"Removed duplicates, {len(latest)} unique entries remaining")
+        return list(latest.values())
 
 
-class ClickUpListsFetcher:
+class ClickUpListsFetcher(_ClickUpBase):
     """Fetches lists from ClickUp API with Space → Folder → List hierarchy."""
     
-    def __init__(self, token: str, team_id: str):
+    def __init__(self, token: str, team_id: str, session: Optional[requests.Session] = None):
+        super().__init__(token, session)  # Token should already include "Bearer" prefix if needed
         self.token = token
         self.team_id = team_id
-        self.base_url = "https://api.clickup.com/api/v2"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': token,  # Token should already include "Bearer" prefix if needed
-            'Content-Type': 'application/json'
-        })
-    
-    def _make_request(self, url: str, max_retries: int = 3) -> Dict[str, Any]:
-        """Make HTTP request with exponential backoff retry logic."""
-        for attempt in range(max_retries + 1):
-            try:
-                response = self.session.get(url, timeout=30)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    # Rate limited - wait and retry
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limited. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code >= 500:
-                    # Server error - retry with backoff
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Server error {response.status_code}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    response.raise_for_status()
-                    
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries:
-                    logger.error(f"Request failed after {max_retries + 1} attempts: {e}")
-                    raise
-                wait_time = 2 ** attempt
-                logger.warning(f"Request failed: {e}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-        
-        raise Exception(f"Request failed after {max_retries + 1} attempts")
     
     def fetch_all_lists(self) -> List[Dict[str, Any]]:
         """
@@ -221,12 +514,10 @@ class ClickUpListsFetcher:
                 space_id = str(space.get('id', ''))
                 space_name = space.get('name', '')
                 
-                time.sleep(0.2)  # Small delay to respect rate limits
-                
                 # 2a. Fetch folders in each space
                 logger.info(f"Fetching folders for space: {space_name}")
                 folders_url = f"{self.base_url}/space/{space_id}/folder?archived=false"
-                folders_data = self._make_request(folders_url)
+                folders_data = self._make_cached_request(folders_url, FOLDER_CACHE_TTL)
                 folders = folders_data.get('folders', [])
                 logger.info(f"Found {len(folders)} folders in space: {space_name}")
                 
@@ -235,11 +526,9 @@ class ClickUpListsFetcher:
                     folder_id = str(folder.get('id', ''))
                     folder_name = folder.get('name', '')
                     
-                    time.sleep(0.2)
-                    
                     logger.info(f"Fetching lists for folder: {folder_name}")
                     lists_url = f"{self.base_url}/folder/{folder_id}/list?archived=false"
-                    lists_data = self._make_request(lists_url)
+                    lists_data = self._make_cached_request(lists_url, LIST_CACHE_TTL)
                     lists = lists_data.get('lists', [])
                     
                     for list_item in lists:
@@ -253,11 +542,9 @@ class ClickUpListsFetcher:
                         })
                 
                 # 2b. Fetch folder-less lists (lists directly under space)
-                time.sleep(0.2)
-                
                 logger.info(f"Fetching folder-less lists for space: {space_name}")
                 root_lists_url = f"{self.base_url}/space/{space_id}/list?archived=false"
-                root_lists_data = self._make_request(root_lists_url)
+                root_lists_data = self._make_cached_request(root_lists_url, LIST_CACHE_TTL)
                 root_lists = root_lists_data.get('lists', [])
                 logger.info(f"Found {len(root_lists)} folder-less lists in space: {space_name}")
                 
@@ -279,57 +566,27 @@ class ClickUpListsFetcher:
             raise
 
 
-class ClickUpTasksFetcher:
+class ClickUpTasksFetcher(_ClickUpBase):
     """Fetches ALL tasks (open, closed, archived, subtasks) from ClickUp Space."""
     
-    def __init__(self, token: str, space_id: str):
+    def __init__(self, token: str, space_id: str, session: Optional[requests.Session] = None):
+        super().__init__(token, session)
         self.token = token
         self.space_id = space_id
-        self.base_url = "https://api.clickup.com/api/v2"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': token,
-            'Content-Type': 'application/json'
-        })
-    
-    def _make_request(self, url: str, max_retries: int = 3) -> Dict[str, Any]:
-        """Make HTTP request with exponential backoff retry logic."""
-        for attempt in range(max_retries + 1):
-            try:
-                response = self.session.get(url, timeout=30)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limited. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code >= 500:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Server error {response.status_code}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    response.raise_for_status()
-                    
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries:
-                    logger.error(f"Request failed after {max_retries + 1} attempts: {e}")
-                    raise
-                wait_time = 2 ** attempt
-                logger.warning(f"Request failed: {e}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-        
-        raise Exception(f"Request failed after {max_retries + 1} attempts")
     
-    def fetch_all_tasks(self) -> List[Dict[str, Any]]:
+    def fetch_all_tasks(self, max_workers: int = 8) -> List[Dict[str, Any]]:
         """
         Fetch ALL tasks from ClickUp Space (open, closed, archived, subtasks).
         
+        The folder/list hierarchy is walked first; the paginated task fetches
+        per list are independent, so up to `max_workers` lists are fetched at
+        once over the shared session and collected in hierarchy order.
+        
         Returns a list of dictionaries with task information.
         """
         all_tasks = []
+        # Arguments for _fetch_tasks_from_list, one per list
+        list_jobs = []
         
         try:
             # Get space details
@@ -346,9 +603,8 @@ class ClickUpTasksFetcher:
                 logger.info(f"Fetching {'archived' if archived else 'active/closed'} tasks...")
                 
                 # Get folders
-                time.sleep(0.2)
                 folders_url = f"{self.base_url}/space/{self.space_id}/folder?archived={archived_str}"
-                folders_data = self._make_request(folders_url)
+                folders_data = self._make_cached_request(folders_url, FOLDER_CACHE_TTL)
                 folders = folders_data.get('folders', [])
                 logger.info(f"Found {len(folders)} {'archived' if archived else 'active'} folders")
                 
@@ -357,27 +613,24 @@ class ClickUpTasksFetcher:
                     folder_id = str(folder.get('id', ''))
                     folder_name = folder.get('name', '')
                     
-                    time.sleep(0.2)
                     lists_url = f"{self.base_url}/folder/{folder_id}/list?archived={archived_str}"
-                    lists_data = self._make_request(lists_url)
+                    lists_data = self._make_cached_request(lists_url, LIST_CACHE_TTL)
                     lists = lists_data.get('lists', [])
                     
                     for list_item in lists:
                         list_id = str(list_item.get('id', ''))
                         list_name = list_item.get('name', '')
                         
-                        tasks = self._fetch_tasks_from_list(
+                        list_jobs.append((
                             list_id, archived_str,
                             space_id, space_name,
                             folder_id, folder_name,
                             list_id, list_name
-                        )
-                        all_tasks.extend(tasks)
+                        ))
                 
                 # Fetch tasks from folder-less lists
-                time.sleep(0.2)
                 root_lists_url = f"{self.base_url}/space/{self.space_id}/list?archived={archived_str}"
-                root_lists_data = self._make_request(root_lists_url)
+                root_lists_data = self._make_cached_request(root_lists_url, LIST_CACHE_TTL)
                 root_lists = root_lists_data.get('lists', [])
                 logger.info(f"Found {len(root_lists)} {'archived' if archived else 'active'} folder-less lists")
                 
@@ -385,12 +638,16 @@ class ClickUpTasksFetcher:
                     list_id = str(list_item.get('id', ''))
                     list_name = list_item.get('name', '')
                     
-                    tasks = self._fetch_tasks_from_list(
+                    list_jobs.append((
                         list_id, archived_str,
                         space_id, space_name,
                         '', '',  # no folder
                         list_id, list_name
-                    )
+                    ))
+            
+            logger.info(f"Fetching tasks from {len(list_jobs)} lists...")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for tasks in executor.map(lambda job: self._fetch_tasks_from_list(*job), list_jobs):
                     all_tasks.extend(tasks)
             
             logger.info(f"Total tasks fetched: {len(all_tasks)}")
@@ -412,8 +669,6 @@ class ClickUpTasksFetcher:
         limit = 100
         
         while True:
-            time.sleep(0.3)  # Rate limiting
-            
             url = (
                 f"{self.base_url}/list/{list_id}/task"
                 f"?page={page}&limit={limit}"
@@ -465,53 +720,18 @@ class ClickUpTasksFetcher:
         return tasks
 
 
-class ClickUpAccountsFetcher:
+class ClickUpAccountsFetcher(_ClickUpBase):
     """Fetches Account tasks from a specific ClickUp list with custom fields."""
     
     def __init__(self, token: str, list_id: str, 
-                 connected_cf_id: str, hours_discount_cf_id: str, arr_cf_id: str):
+                 connected_cf_id: str, hours_discount_cf_id: str, arr_cf_id: str,
+                 session: Optional[requests.Session] = None):
+        super().__init__(token, session)
         self.token = token
         self.list_id = list_id
         self.connected_cf_id = connected_cf_id
         self.hours_discount_cf_id = hours_discount_cf_id
         self.arr_cf_id = arr_cf_id
-        self.base_url = "https://api.clickup.com/api/v2"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': token,
-            'Content-Type': 'application/json'
-        })
-    
-    def _make_request(self, url: str, max_retries: int = 3) -> Dict[str, Any]:
-        """Make HTTP request with exponential backoff retry logic."""
-        for attempt in range(max_retries + 1):
-            try:
-                response = self.session.get(url, timeout=30)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limited. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code >= 500:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Server error {response.status_code}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    response.raise_for_status()
-                    
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries:
-                    logger.error(f"Request failed after {max_retries + 1} attempts: {e}")
-                    raise
-                wait_time = 2 ** attempt
-                logger.warning(f"Request failed: {e}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-        
-        raise Exception(f"Request failed after {max_retries + 1} attempts")
     
     def fetch_all_accounts(self) -> List[Dict[str, Any]]:
         """
@@ -526,8 +746,6 @@ class ClickUpAccountsFetcher:
             logger.info(f"Fetching accounts from list {self.list_id}...")
             
             while True:
-                time.sleep(0.3)  # Rate limiting
-                
                 url = (
                     f"{self.base_url}/list/{self.list_id}/task"
                     f"?archived=false&include_closed=true&subtasks=true&page={page}"
@@ -589,8 +807,8 @@ class ClickUpAccountsFetcher:
                     date_created_dt = None
                     if date_created:
                         try:
-                            date_created_dt = pd.to_datetime(int(date_created), unit='ms', utc=True)
-                        except (ValueError, TypeError):
+                            date_created_dt = ms_to_utc(int(date_created))
+                        except (ValueError, TypeError, OverflowError, OSError):
                             pass
                     
                     # Assignees
@@ -624,55 +842,21 @@ class ClickUpAccountsFetcher:
             raise
 
 
-class ClickUpAppsFetcher:
+class ClickUpAppsFetcher(_ClickUpBase):
     """Fetches Application tasks from team level, filtered by custom_item_id."""
     
     def __init__(self, token: str, team_id: str,
                  arr_cf_id: str, last_updated_cf_id: str, 
-                 maintenance_cf_id: str, accounts_rel_cf_id: str):
+                 maintenance_cf_id: str, accounts_rel_cf_id: str,
+                 session: Optional[requests.Session] = None):
+        super().__init__(token, session)
         self.token = token
         self.team_id = team_id
         self.arr_cf_id = arr_cf_id
         self.last_updated_cf_id = last_updated_cf_id
         self.maintenance_cf_id = maintenance_cf_id
         self.accounts_rel_cf_id = accounts_rel_cf_id
-        self.base_url = "https://api.clickup.com/api/v2"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': token,
-            'Content-Type': 'application/json'
-        })
-    
-    def _make_request(self, url: str, max_retries: int = 3) -> Dict[str, Any]:
-        """Make HTTP request with exponential backoff retry logic."""
-        for attempt in range(max_retries + 1):
-            try:
-                response = self.session.get(url, timeout=30)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limited. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code >= 500:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Server error {response.status_code}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    response.raise_for_status()
-                    
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries:
-                    logger.error(f"Request failed after {max_retries + 1} attempts: {e}")
-                    raise
-                wait_time = 2 ** attempt
-                logger.warning(f"Request failed: {e}. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-        
-        raise Exception(f"Request failed after {max_retries + 1} attempts")
+        self._cf_ids = frozenset((arr_cf_id, last_updated_cf_id, maintenance_cf_id, accounts_rel_cf_id))
     
     def fetch_all_apps(self) -> List[Dict[str, Any]]:
         """
@@ -687,8 +871,6 @@ class ClickUpAppsFetcher:
             logger.info(f"Fetching Application tasks from team {self.team_id}...")
             
             while True:
-                time.sleep(0.3)  # Rate limiting
-                
                 url = (
                     f"{self.base_url}/team/{self.team_id}/task"
                     f"?include_closed=true&subtasks=true&page={page}"
@@ -707,15 +889,22 @@ class ClickUpAppsFetcher:
                 
                 # Process each application task
                 for task in app_tasks:
-                    # Build lookup for custom fields
-                    fields_by_id = {}
-                    for field in task.get('custom_fields', []):
-                        fields_by_id[field.get('id')] = field
+                    # Pick out the four custom fields we need in a single pass
+                    arr_value = last_updated_raw = maintenance_value = accounts_value = None
+                    for field in task.get('custom_fields') or ():
+                        field_id = field.get('id')
+                        if field_id not in self._cf_ids:
+                            continue
+                        if field_id == self.arr_cf_id:
+                            arr_value = field.get('value')
+                        elif field_id == self.last_updated_cf_id:
+                            last_updated_raw = field.get('value')
+                        elif field_id == self.maintenance_cf_id:
+                            maintenance_value = field.get('value')
+                        elif field_id == self.accounts_rel_cf_id:
+                            accounts_value = field.get('value')
                     
-                    # Extract custom field values
                     # ARR (currency/numeric) - convert to float
-                    arr_field = fields_by_id.get(self.arr_cf_id, {})
-                    arr_value = arr_field.get('value')
                     if arr_value is not None:
                         try:
                             arr_value = float(arr_value)
@@ -725,26 +914,25 @@ class ClickUpAppsFetcher:
                         arr_value = None
                     
                     # Last Updated (epoch ms -> datetime)
-                    last_updated_field = fields_by_id.get(self.last_updated_cf_id, {})
-                    last_updated_raw = last_updated_field.get('value')
                     last_updated = None
                     if last_updated_raw:
                         try:
-                            last_updated = pd.to_datetime(int(last_updated_raw), unit='ms', utc=True)
-                        except (ValueError, TypeError):
+                            last_updated = ms_to_utc(int(last_updated_raw))
+                        except (ValueError, TypeError, OverflowError, OSError):
                             pass
                     
                     # Maintenance (checkbox true/false)
-                    maintenance_field = fields_by_id.get(self.maintenance_cf_id, {})
-                    maintenance_value = maintenance_field.get('value')
                     maintenance = maintenance_value == 'true' if maintenance_value else False
                     
                     # Accounts Relationship (array of linked tasks)
-                    accounts_field = fields_by_id.get(self.accounts_rel_cf_id, {})
-                    accounts_value = accounts_field.get('value', [])
                     account_task_ids = ''
                     if isinstance(accounts_value, list):
-                        account_ids = [str(x.get('id')) for x in accounts_value if x.get('id')]
+                        account_ids = []
+                        append = account_ids.append
+                        for linked in accounts_value:
+                            linked_id = linked.get('id') if isinstance(linked, dict) else None
+                            if linked_id:
+                                append(str(linked_id))
                         account_task_ids = ', '.join(account_ids)
                     
                     # Base data for the task
@@ -776,16 +964,43 @@ class ClickUpAppsFetcher:
             raise
 
 
+@lru_cache(maxsize=4096)
+def sha256_hex(value: str) -> str:
+    """Hex SHA-256 of a string; cached since the same emails repeat across entries."""
+    return hashlib.sha256(value.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+# json_normalize(sep='_') already yields the target names for nested fields;
+# only the top-level epoch/duration fields are renamed
+TIME_ENTRY_RENAMES = {
+    'start': 'start_utc',
+    'end': 'end_utc',
+    'duration': 'duration_ms',
+}
+
+TIME_ENTRY_SOURCE_COLUMNS = [
+    'id', 'start_utc', 'end_utc', 'duration_ms', 'at', 'billable', 'description', 'source',
+    'is_locked', 'approval_id', 'task_url', 'task_id', 'task_name', 'task_custom_type',
+    'task_custom_id', 'task_status_status', 'task_status_color', 'task_status_type',
+    'task_status_orderindex', 'user_id', 'user_username', 'user_email', 'user_color',
+    'user_initials', 'user_profilePicture', 'task_location_list_id', 'task_location_folder_id',
+    'task_location_space_id',
+]
+
+
 class DataTransformer:
     """Transforms raw ClickUp data into BigQuery-ready format."""
     
+    _TRUE_STRINGS = frozenset(('true', '1', 'yes', 'on'))
+    
     @staticmethod
     def safe_bool(value: Any) -> bool:
         """Safely convert various boolean representations to Python bool."""
-        if isinstance(value, bool):
+        value_type = type(value)
+        if value_type is bool:
             return value
-        if isinstance(value, str):
-            return value.lower() in ('true', '1', 'yes', 'on')
+        if value_type is str:
+            return value.lower() in DataTransformer._TRUE_STRINGS
         if isinstance(value, (int, float)):
             return bool(value)
         return False
@@ -793,63 +1008,72 @@ class DataTransformer:
     @staticmethod
     def safe_int(value: Any) -> Optional[int]:
         """Safely convert value to integer, returning None for invalid values."""
-        if pd.isna(value) or value is None:
+        # JSON only yields None, int, float or str; dispatch on the exact type
+        value_type = type(value)
+        if value_type is int:
+            return value
+        if value_type is str:
+            try:
+                return int(value)
+            except ValueError:
+                pass  # Decimal strings such as "3600000.0" fall through
+        if value is None or value != value:
             return None
         try:
             return int(float(value))
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, OverflowError):
             return None
     
+    @staticmethod
+    def safe_text(value: Any) -> Any:
+        """Missing (None) strings become empty strings, as in transform_time_entries."""
+        return '' if value is None else value
+    
     @staticmethod
     def transform_time_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
         """Transform a single time entry to BigQuery format."""
         try:
             # Extract basic fields
-            entry_id = str(entry.get('id', ''))
+            entry_id = str(DataTransformer.safe_text(entry.get('id')))
             start_ms = DataTransformer.safe_int(entry.get('start', 0))
             end_ms = DataTransformer.safe_int(entry.get('end', 0))
             duration_ms = DataTransformer.safe_int(entry.get('duration', 0))
             at_ms = DataTransformer.safe_int(entry.get('at', 0))
             
             # Convert timestamps
-            start_utc = pd.to_datetime(start_ms, unit='ms', utc=True) if start_ms else None
-            end_utc = pd.to_datetime(end_ms, unit='ms', utc=True) if end_ms else None
-            at_utc = pd.to_datetime(at_ms, unit='ms', utc=True) if at_ms else None
+            start_utc = ms_to_utc(start_ms) if start_ms else None
+            end_utc = ms_to_utc(end_ms) if end_ms else None
+            at_utc = ms_to_utc(at_ms) if at_ms else None
             
             # Calculate duration in hours
             duration_hours = duration_ms / 3600000.0 if duration_ms else 0.0
             
-            # Convert to Oslo timezone for date calculation
-            start_date_oslo = None
-            if start_utc:
-                start_date_oslo = start_utc.tz_convert('Europe/Oslo').date()
-            
             # Extract task information
-            task = entry.get('task', {})
+            task = entry.get('task') or {}
             task_id = str(task.get('id', '')) if task.get('id') else None
-            task_name = task.get('name', '')
+            task_name = DataTransformer.safe_text(task.get('name'))
             task_custom_type = str(task.get('custom_type', '')) if task.get('custom_type') is not None else None
             task_custom_id = str(task.get('custom_id', '')) if task.get('custom_id') is not None else None
             
             # Extract task status
-            task_status = task.get('status', {})
-            task_status_status = task_status.get('status', '')
-            task_status_color = task_status.get('color', '')
-            task_status_type = task_status.get('type', '')
+            task_status = task.get('status') or {}
+            task_status_status = DataTransformer.safe_text(task_status.get('status'))
+            task_status_color = DataTransformer.safe_text(task_status.get('color'))
+            task_status_type = DataTransformer.safe_text(task_status.get('type'))
             task_status_orderindex = DataTransformer.safe_int(task_status.get('orderindex'))
             
             # Extract user information
-            user = entry.get('user', {})
+            user = entry.get('user') or {}
             user_id = str(user.get('id', '')) if user.get('id') else None
-            user_username = user.get('username', '')
-            user_email = user.get('email', '')
-            user_email_sha256 = hashlib.sha256(user_email.encode()).hexdigest() if user_email else None
-            user_color = user.get('color', '')
-            user_initials = user.get('initials', '')
-            user_profile_picture = user.get('profilePicture', '')
+            user_username = DataTransformer.safe_text(user.get('username'))
+            user_email = DataTransformer.safe_text(user.get('email'))
+            user_email_sha256 = sha256_hex(user_email) if user_email else None
+            user_color = DataTransformer.safe_text(user.get('color'))
+            user_initials = DataTransformer.safe_text(user.get('initials'))
+            user_profile_picture = DataTransformer.safe_text(user.get('profilePicture'))
             
             # Extract task location
-            task_location = entry.get('task_location', {})
+            task_location = entry.get('task_location') or {}
             task_location_list_id = str(task_location.get('list_id', '')) if task_location.get('list_id') else None
             task_location_folder_id = str(task_location.get('folder_id', '')) if task_location.get('folder_id') else None
             task_location_space_id = str(task_location.get('space_id', '')) if task_location.get('space_id') else None
@@ -861,12 +1085,12 @@ class DataTransformer:
                 'duration_ms': DataTransformer.safe_int(duration_ms),
                 'duration_hours': duration_hours,
                 'billable': DataTransformer.safe_bool(entry.get('billable')),
-                'description': entry.get('description', ''),
-                'source': entry.get('source', ''),
+                'description': DataTransformer.safe_text(entry.get('description')),
+                'source': DataTransformer.safe_text(entry.get('source')),
                 'at': at_utc,
                 'is_locked': DataTransformer.safe_bool(entry.get('is_locked')),
                 'approval_id': str(entry.get('approval_id', '')) if entry.get('approval_id') else None,
-                'task_url': entry.get('task_url', ''),
+                'task_url': DataTransformer.safe_text(entry.get('task_url')),
                 'task_id': task_id,
                 'task_name': task_name,
                 'task_custom_type': task_custom_type,
@@ -884,8 +1108,7 @@ class DataTransformer:
                 'user_profilePicture': user_profile_picture,
                 'task_location_list_id': task_location_list_id,
                 'task_location_folder_id': task_location_folder_id,
-                'task_location_space_id': task_location_space_id,
-                'start_date_oslo': start_date_oslo
+                'task_location_space_id': task_location_space_id
             }
             
         except Exception as e:
@@ -921,19 +1144,214 @@ class DataTransformer:
                 'user_profilePicture': '',
                 'task_location_list_id': None,
                 'task_location_folder_id': None,
-                'task_location_space_id': None,
-                'start_date_oslo': None
+                'task_location_space_id': None
             }
 
-
-class BigQueryListsManager:
-    """Manages BigQuery operations for ClickUp lists data."""
     
-    def __init__(self, project_id: str, dataset: str, lists_table: str):
-        self.project_id = project_id
-        self.dataset = dataset
-        self.lists_table = lists_table
-        self.client = bigquery.Client(project=project_id)
+    @staticmethod
+    def transform_time_entries_rowwise(entries: List[Dict[str, Any]]) -> 'pd.DataFrame':
+        """Transform entries one by one with transform_time_entry, filling columns directly."""
+        builder = ColumnarBuilder(len(entries), STAGING_SCHEMA)
+        for i, entry in enumerate(entries):
+            builder.set(i, DataTransformer.transform_time_entry(entry))
+        return builder.to_frame()
+    
+    @staticmethod
+    def transform_time_entries(entries: List[Dict[str, Any]]) -> 'pd.DataFrame':
+        """
+        Transform raw time entries to BigQuery format column-wise.
+        
+        Produces the same columns as transform_time_entry, but derives them
+        with vectorized pandas operations over the whole batch instead of
+        building one dict per entry.
+        """
+        import pandas as pd
+        
+        # One flattening pass: nested task/user/status/location keys become
+        # task_id, user_email, task_status_status, task_location_list_id, ...
+        flat = pd.json_normalize(entries, sep='_').rename(columns=TIME_ENTRY_RENAMES)
+        flat = flat.reindex(columns=TIME_ENTRY_SOURCE_COLUMNS)
+        
+        start_utc = DataTransformer._to_utc(flat['start_utc'])
+        duration_ms = DataTransformer._to_int(flat['duration_ms'])
+        user_email = DataTransformer._to_text(flat['user_email'])
+        
+        return pd.DataFrame({
+            'id': DataTransformer._to_str(flat['id']).fillna(''),
+            'start_utc': start_utc,
+            'end_utc': DataTransformer._to_utc(flat['end_utc']),
+            'duration_ms': duration_ms,
+            'duration_hours': (duration_ms / 3600000.0).fillna(0.0).astype('float64'),
+            'billable': DataTransformer._to_bool(flat['billable']),
+            'description': DataTransformer._to_text(flat['description']),
+            'source': DataTransformer._to_text(flat['source']),
+            'at': DataTransformer._to_utc(flat['at']),
+            'is_locked': DataTransformer._to_bool(flat['is_locked']),
+            'approval_id': DataTransformer._to_id(flat['approval_id']),
+            'task_url': DataTransformer._to_text(flat['task_url']),
+            'task_id': DataTransformer._to_id(flat['task_id']),
+            'task_name': DataTransformer._to_text(flat['task_name']),
+            'task_custom_type': DataTransformer._to_str(flat['task_custom_type']),
+            'task_custom_id': DataTransformer._to_str(flat['task_custom_id']),
+            'task_status_status': DataTransformer._to_text(flat['task_status_status']),
+            'task_status_color': DataTransformer._to_text(flat['task_status_color']),
+            'task_status_type': DataTransformer._to_text(flat['task_status_type']),
+            'task_status_orderindex': DataTransformer._to_int(flat['task_status_orderindex']),
+            'user_id': DataTransformer._to_id(flat['user_id']),
+            'user_username': DataTransformer._to_text(flat['user_username']),
+            'user_email': user_email,
+            'user_email_sha256': DataTransformer._hash_emails(user_email),
+            'user_color': DataTransformer._to_text(flat['user_color']),
+            'user_initials': DataTransformer._to_text(flat['user_initials']),
+            'user_profilePicture': DataTransformer._to_text(flat['user_profilePicture']),
+            'task_location_list_id': DataTransformer._to_id(flat['task_location_list_id']),
+            'task_location_folder_id': DataTransformer._to_id(flat['task_location_folder_id']),
+            'task_location_space_id': DataTransformer._to_id(flat['task_location_space_id']),
+        })
+    
+    @staticmethod
+    def _to_int(series: 'pd.Series') -> 'pd.Series':
+        """Vectorized safe_int: numeric strings/numbers to nullable Int64."""
+        import numpy as np
+        import pandas as pd
+        
+        return np.trunc(pd.to_numeric(series, errors='coerce')).astype('Int64')
+    
+    @staticmethod
+    def _to_utc(series: 'pd.Series') -> 'pd.Series':
+        """Epoch milliseconds to UTC timestamps; missing or zero becomes NaT."""
+        import numpy as np
+        import pandas as pd
+        
+        ms = pd.to_numeric(series, errors='coerce')
+        missing = (ms.isna() | (ms == 0)).to_numpy()
+        # Reinterpret the int64 milliseconds as datetime64[ms] (no per-value parsing)
+        # and attach UTC, which is metadata only
+        values = ms.fillna(0).to_numpy(dtype='int64', copy=True).view('datetime64[ms]')
+        values[missing] = np.datetime64('NaT')
+        return pd.Series(values, index=series.index).dt.tz_localize('UTC')
+    
+    @staticmethod
+    def _hash_emails(emails: 'pd.Series') -> 'pd.Series':
+        """SHA-256 each distinct email once and map the digests back onto the rows."""
+        unique_emails = emails[emails != ''].dropna().unique()
+        digests = {email: sha256_hex(email) for email in unique_emails}
+        return emails.map(digests)
+    
+    @staticmethod
+    def _to_bool(series: 'pd.Series') -> 'pd.Series':
+        """Vectorized safe_bool; missing values are False."""
+        return series.where(series.notna(), False).map(DataTransformer.safe_bool).astype(bool)
+    
+    @staticmethod
+    def _to_text(series: 'pd.Series') -> 'pd.Series':
+        """Missing strings become empty strings."""
+        return series.where(series.notna(), '')
+    
+    @staticmethod
+    def _to_str(series: 'pd.Series') -> 'pd.Series':
+        """Values to strings, keeping missing values; integral floats (ints upcast by NaN) print as ints."""
+        return series.map(
+            lambda value: str(int(value)) if isinstance(value, float) and value.is_integer() else str(value),
+            na_action='ignore'
+        )
+    
+    @staticmethod
+    def _to_id(series: 'pd.Series') -> 'pd.Series':
+        """Truthy ids become strings, anything else None."""
+        return DataTransformer._to_str(series.where(series.notna() & series.astype(bool)))
+
+
+class ColumnarBuilder:
+    """
+    Fills preallocated per-column arrays row by row (struct-of-arrays).
+    
+    Used by the per-row transform so a batch never exists as a list of
+    dicts: each transformed row is written into typed NumPy arrays sized up
+    front and dropped immediately. Integers and timestamps are stored as
+    int64 with a null mask and converted in bulk by to_frame().
+    """
+    
+    _EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    
+    def __init__(self, n: int, schema: List[bigquery.SchemaField]):
+        import numpy as np
+        
+        self.n = n
+        self.schema = schema
+        self.values: Dict[str, Any] = {}
+        self.masks: Dict[str, Any] = {}
+        for field in schema:
+            if field.field_type in ('INTEGER', 'TIMESTAMP'):
+                self.values[field.name] = np.zeros(n, dtype='int64')
+                self.masks[field.name] = np.ones(n, dtype=bool)
+            elif field.field_type == 'FLOAT':
+                self.values[field.name] = np.full(n, np.nan, dtype='float64')
+            elif field.field_type == 'BOOLEAN':
+                self.values[field.name] = np.zeros(n, dtype=bool)
+            else:
+                self.values[field.name] = np.empty(n, dtype=object)
+    
+    def set(self, i: int, row: Dict[str, Any]):
+        """Write one transformed row into position i."""
+        for field in self.schema:
+            value = row.get(field.name)
+            if value is None:
+                continue
+            if field.field_type == 'TIMESTAMP':
+                self.values[field.name][i] = (value - self._EPOCH) // timedelta(microseconds=1)
+                self.masks[field.name][i] = False
+            elif field.field_type == 'INTEGER':
+                self.values[field.name][i] = value
+                self.masks[field.name][i] = False
+            else:
+                self.values[field.name][i] = value
+    
+    def to_frame(self) -> 'pd.DataFrame':
+        """Wrap the arrays in a DataFrame, converting integer and timestamp columns in bulk."""
+        import numpy as np
+        import pandas as pd
+        
+        columns = {}
+        for field in self.schema:
+            values = self.values[field.name]
+            if field.field_type == 'INTEGER':
+                columns[field.name] = pd.arrays.IntegerArray(values, self.masks[field.name])
+            elif field.field_type == 'TIMESTAMP':
+                timestamps = values.view('datetime64[us]')
+                timestamps[self.masks[field.name]] = np.datetime64('NaT')
+                columns[field.name] = pd.Series(timestamps).dt.tz_localize('UTC')
+            else:
+                columns[field.name] = values
+        return pd.DataFrame(columns)
+
+
+def arrow_schema(schema: List[bigquery.SchemaField]) -> 'pa.Schema':
+    """Build the Arrow schema matching a BigQuery schema."""
+    import pyarrow as pa
+    
+    arrow_types = {
+        'STRING': pa.string(),
+        'INTEGER': pa.int64(),
+        'FLOAT': pa.float64(),
+        'BOOLEAN': pa.bool_(),
+        'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+        'DATE': pa.date32(),
+    }
+    return pa.schema([
+        pa.field(field.name, arrow_types[field.field_type], nullable=field.mode != 'REQUIRED')
+        for field in schema
+    ])
+
+
+@lru_cache(maxsize=None)
+def get_bigquery_client(project_id: str) -> bigquery.Client:
+    """Return the process-wide BigQuery client for a project, creating it on first use."""
+    return bigquery.Client(project=project_id)
+
+
+class _BQBase:
+    """Shared BigQuery plumbing for the table managers."""
     
     def ensure_dataset_exists(self):
         """Ensure the dataset exists."""
@@ -943,10 +1361,72 @@ class BigQueryListsManager:
             logger.info(f"Dataset {dataset_id} already exists")
         except NotFound:
             dataset = bigquery.Dataset(dataset_id)
-            dataset.location = "US"
+            dataset.location = "US"  # Set location as needed
             dataset = self.client.create_dataset(dataset, timeout=30)
             logger.info(f"Created dataset {dataset_id}")
     
+    def _load_dataframe(self, df: 'pd.DataFrame', table_id: str, schema: List[bigquery.SchemaField]):
+        """
+        Load a DataFrame into a table, replacing all existing data.
+        
+        The frame is converted to Arrow with the table's schema and written to
+        a temporary Parquet file client-side without dictionary encoding (these
+        tables are mostly unique strings), then sent with a plain file load job.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        table = pa.Table.from_pandas(df, schema=arrow_schema(schema), preserve_index=False)
+        with tempfile.NamedTemporaryFile(suffix='.parquet') as parquet_file:
+            pq.write_table(
+                table, parquet_file,
+                compression='snappy', use_dictionary=False, row_group_size=PARQUET_ROW_GROUP_SIZE
+            )
+            parquet_file.flush()
+            parquet_file.seek(0)
+            self._load_parquet(parquet_file, table_id, schema)
+    
+    @staticmethod
+    def _parquet_job_config(schema: List[bigquery.SchemaField]) -> bigquery.LoadJobConfig:
+        """Load job settings shared by file and GCS loads."""
+        return bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_TRUNCATE",  # Replace all data
+            schema=schema  # Explicit schema skips autodetection
+        )
+    
+    def _load_parquet(self, parquet_file, table_id: str, schema: List[bigquery.SchemaField]):
+        """Load an open Parquet file into a table with an explicit schema, replacing all data."""
+        job = self.client.load_table_from_file(parquet_file, table_id, job_config=self._parquet_job_config(schema))
+        job.result()  # Wait for job to complete
+        return job
+    
+    def _load_parquet_uri(self, uri: str, table_id: str, schema: List[bigquery.SchemaField]):
+        """Load a Parquet object from GCS into a table with an explicit schema, replacing all data."""
+        job = self.client.load_table_from_uri(uri, table_id, job_config=self._parquet_job_config(schema))
+        job.result()  # Wait for job to complete
+        return job
+
+
+class BigQueryListsManager(_BQBase):
+    """Manages BigQuery operations for ClickUp lists data."""
+    
+    SCHEMA = [
+        bigquery.SchemaField("space_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("space_name", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("folder_id", "STRING"),
+        bigquery.SchemaField("folder_name", "STRING"),
+        bigquery.SchemaField("list_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("list_name", "STRING", mode="REQUIRED"),
+    ]
+    
+    def __init__(self, project_id: str, dataset: str, lists_table: str,
+                 client: Optional[bigquery.Client] = None):
+        self.project_id = project_id
+        self.dataset = dataset
+        self.lists_table = lists_table
+        self.client = client or get_bigquery_client(project_id)
+    
     def create_lists_table_if_not_exists(self):
         """Create lists table if it doesn't exist."""
         table_id = f"{self.project_id}.{self.dataset}.{self.lists_table}"
@@ -955,53 +1435,43 @@ class BigQueryListsManager:
             self.client.get_table(table_id)
             logger.info(f"Lists table {table_id} already exists")
         except NotFound:
-            schema = [
-                bigquery.SchemaField("space_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("space_name", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("folder_id", "STRING"),
-                bigquery.SchemaField("folder_name", "STRING"),
-                bigquery.SchemaField("list_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("list_name", "STRING", mode="REQUIRED"),
-            ]
-            
-            table = bigquery.Table(table_id, schema=schema)
+            table = bigquery.Table(table_id, schema=self.SCHEMA)
             table = self.client.create_table(table)
             logger.info(f"Created lists table {table_id}")
     
-    def upload_lists(self, df: pd.DataFrame):
+    def upload_lists(self, df: 'pd.DataFrame'):
         """Upload lists DataFrame to BigQuery, replacing all existing data."""
         table_id = f"{self.project_id}.{self.dataset}.{self.lists_table}"
-        
-        job_config = bigquery.LoadJobConfig(
-            write_disposition="WRITE_TRUNCATE"  # Replace all data
-        )
-        
-        job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
-        job.result()  # Wait for job to complete
+        self._load_dataframe(df, table_id, self.SCHEMA)
         
         logger.info(f"Uploaded {len(df)} lists to {table_id}")
 
 
-class BigQueryTasksManager:
+class BigQueryTasksManager(_BQBase):
     """Manages BigQuery operations for ClickUp tasks data."""
     
-    def __init__(self, project_id: str, dataset: str, tasks_table: str):
+    SCHEMA = [
+        bigquery.SchemaField("space_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("space_name", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("folder_id", "STRING"),
+        bigquery.SchemaField("folder_name", "STRING"),
+        bigquery.SchemaField("list_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("list_name", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("task_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("task_name", "STRING"),
+        bigquery.SchemaField("status", "STRING"),
+        bigquery.SchemaField("time_estimate_hrs", "FLOAT"),
+        bigquery.SchemaField("url", "STRING"),
+        bigquery.SchemaField("closed", "BOOLEAN"),
+        bigquery.SchemaField("archived", "BOOLEAN"),
+    ]
+    
+    def __init__(self, project_id: str, dataset: str, tasks_table: str,
+                 client: Optional[bigquery.Client] = None):
         self.project_id = project_id
         self.dataset = dataset
         self.tasks_table = tasks_table
-        self.client = bigquery.Client(project=project_id)
-    
-    def ensure_dataset_exists(self):
-        """Ensure the dataset exists."""
-        dataset_id = f"{self.project_id}.{self.dataset}"
-        try:
-            self.client.get_dataset(dataset_id)
-            logger.info(f"Dataset {dataset_id} already exists")
-        except NotFound:
-            dataset = bigquery.Dataset(dataset_id)
-            dataset.location = "US"
-            dataset = self.client.create_dataset(dataset, timeout=30)
-            logger.info(f"Created dataset {dataset_id}")
+        self.client = client or get_bigquery_client(project_id)
     
     def create_tasks_table_if_not_exists(self):
         """Create tasks table if it doesn't exist."""
@@ -1011,60 +1481,39 @@ class BigQueryTasksManager:
             self.client.get_table(table_id)
             logger.info(f"Tasks table {table_id} already exists")
         except NotFound:
-            schema = [
-                bigquery.SchemaField("space_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("space_name", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("folder_id", "STRING"),
-                bigquery.SchemaField("folder_name", "STRING"),
-                bigquery.SchemaField("list_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("list_name", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("task_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("task_name", "STRING"),
-                bigquery.SchemaField("status", "STRING"),
-                bigquery.SchemaField("time_estimate_hrs", "FLOAT"),
-                bigquery.SchemaField("url", "STRING"),
-                bigquery.SchemaField("closed", "BOOLEAN"),
-                bigquery.SchemaField("archived", "BOOLEAN"),
-            ]
-            
-            table = bigquery.Table(table_id, schema=schema)
+            table = bigquery.Table(table_id, schema=self.SCHEMA)
             table = self.client.create_table(table)
             logger.info(f"Created tasks table {table_id}")
     
-    def upload_tasks(self, df: pd.DataFrame):
+    def upload_tasks(self, df: 'pd.DataFrame'):
         """Upload tasks DataFrame to BigQuery, replacing all existing data."""
         table_id = f"{self.project_id}.{self.dataset}.{self.tasks_table}"
-        
-        job_config = bigquery.LoadJobConfig(
-            write_disposition="WRITE_TRUNCATE"  # Replace all data
-        )
-        
-        job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
-        job.result()  # Wait for job to complete
+        self._load_dataframe(df, table_id, self.SCHEMA)
         
         logger.info(f"Uploaded {len(df)} tasks to {table_id}")
 
 
-class BigQueryAccountsManager:
+class BigQueryAccountsManager(_BQBase):
     """Manages BigQuery operations for ClickUp accounts data."""
     
-    def __init__(self, project_id: str, dataset: str, accounts_table: str):
+    # Explicit schema to ensure proper types (especially FLOAT for arr)
+    SCHEMA = [
+        bigquery.SchemaField("account_task_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("account_name", "STRING"),
+        bigquery.SchemaField("connected_list_id", "STRING"),
+        bigquery.SchemaField("hours_discount", "FLOAT"),
+        bigquery.SchemaField("status", "STRING"),
+        bigquery.SchemaField("date_created", "TIMESTAMP"),
+        bigquery.SchemaField("assignees", "STRING"),
+        bigquery.SchemaField("arr", "FLOAT"),
+    ]
+    
+    def __init__(self, project_id: str, dataset: str, accounts_table: str,
+                 client: Optional[bigquery.Client] = None):
         self.project_id = project_id
         self.dataset = dataset
         self.accounts_table = accounts_table
-        self.client = bigquery.Client(project=project_id)
-    
-    def ensure_dataset_exists(self):
-        """Ensure the dataset exists."""
-        dataset_id = f"{self.project_id}.{self.dataset}"
-        try:
-            self.client.get_dataset(dataset_id)
-            logger.info(f"Dataset {dataset_id} already exists")
-        except NotFound:
-            dataset = bigquery.Dataset(dataset_id)
-            dataset.location = "US"
-            dataset = self.client.create_dataset(dataset, timeout=30)
-            logger.info(f"Created dataset {dataset_id}")
+        self.client = client or get_bigquery_client(project_id)
     
     def create_accounts_table_if_not_exists(self):
         """Create accounts table if it doesn't exist."""
@@ -1074,68 +1523,38 @@ class BigQueryAccountsManager:
             self.client.get_table(table_id)
             logger.info(f"Accounts table {table_id} already exists")
         except NotFound:
-            schema = [
-                bigquery.SchemaField("account_task_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("account_name", "STRING"),
-                bigquery.SchemaField("connected_list_id", "STRING"),
-                bigquery.SchemaField("hours_discount", "FLOAT"),
-                bigquery.SchemaField("status", "STRING"),
-                bigquery.SchemaField("date_created", "TIMESTAMP"),
-                bigquery.SchemaField("assignees", "STRING"),
-                bigquery.SchemaField("arr", "FLOAT"),
-            ]
-            
-            table = bigquery.Table(table_id, schema=schema)
+            table = bigquery.Table(table_id, schema=self.SCHEMA)
             table = self.client.create_table(table)
             logger.info(f"Created accounts table {table_id}")
     
-    def upload_accounts(self, df: pd.DataFrame):
+    def upload_accounts(self, df: 'pd.DataFrame'):
         """Upload accounts DataFrame to BigQuery, replacing all existing data."""
         table_id = f"{self.project_id}.{self.dataset}.{self.accounts_table}"
-        
-        # Define schema to ensure proper types (especially FLOAT for arr)
-        schema = [
-            bigquery.SchemaField("account_task_id", "STRING", mode="REQUIRED"),
-            bigquery.SchemaField("account_name", "STRING"),
-            bigquery.SchemaField("connected_list_id", "STRING"),
-            bigquery.SchemaField("hours_discount", "FLOAT"),
-            bigquery.SchemaField("status", "STRING"),
-            bigquery.SchemaField("date_created", "TIMESTAMP"),
-            bigquery.SchemaField("assignees", "STRING"),
-            bigquery.SchemaField("arr", "FLOAT"),
-        ]
-        
-        job_config = bigquery.LoadJobConfig(
-            write_disposition="WRITE_TRUNCATE",
-            schema=schema  # Explicitly set schema
-        )
-        
-        job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
-        job.result()  # Wait for job to complete
+        self._load_dataframe(df, table_id, self.SCHEMA)
         
         logger.info(f"Uploaded {len(df)} account rows to {table_id}")
 
 
-class BigQueryAppsManager:
+class BigQueryAppsManager(_BQBase):
     """Manages BigQuery operations for ClickUp applications data."""
     
-    def __init__(self, project_id: str, dataset: str, apps_table: str):
+    # Explicit schema to ensure proper types (especially FLOAT for arr)
+    SCHEMA = [
+        bigquery.SchemaField("task_id", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("application_name", "STRING"),
+        bigquery.SchemaField("account_task_ids", "STRING"),
+        bigquery.SchemaField("arr", "FLOAT"),
+        bigquery.SchemaField("last_updated", "TIMESTAMP"),
+        bigquery.SchemaField("status", "STRING"),
+        bigquery.SchemaField("maintenance", "BOOLEAN"),
+    ]
+    
+    def __init__(self, project_id: str, dataset: str, apps_table: str,
+                 client: Optional[bigquery.Client] = None):
         self.project_id = project_id
         self.dataset = dataset
         self.apps_table = apps_table
-        self.client = bigquery.Client(project=project_id)
-    
-    def ensure_dataset_exists(self):
-        """Ensure the dataset exists."""
-        dataset_id = f"{self.project_id}.{self.dataset}"
-        try:
-            self.client.get_dataset(dataset_id)
-            logger.info(f"Dataset {dataset_id} already exists")
-        except NotFound:
-            dataset = bigquery.Dataset(dataset_id)
-            dataset.location = "US"
-            dataset = self.client.create_dataset(dataset, timeout=30)
-            logger.info(f"Created dataset {dataset_id}")
+        self.client = client or get_bigquery_client(project_id)
     
     def create_apps_table_if_not_exists(self):
         """Create apps table if it doesn't exist."""
@@ -1145,181 +1564,193 @@ class BigQueryAppsManager:
             self.client.get_table(table_id)
             logger.info(f"Apps table {table_id} already exists")
         except NotFound:
-            schema = [
-                bigquery.SchemaField("task_id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("application_name", "STRING"),
-                bigquery.SchemaField("account_task_ids", "STRING"),
-                bigquery.SchemaField("arr", "FLOAT"),
-                bigquery.SchemaField("last_updated", "TIMESTAMP"),
-                bigquery.SchemaField("status", "STRING"),
-                bigquery.SchemaField("maintenance", "BOOLEAN"),
-            ]
-            
-            table = bigquery.Table(table_id, schema=schema)
+            table = bigquery.Table(table_id, schema=self.SCHEMA)
             table = self.client.create_table(table)
             logger.info(f"Created apps table {table_id}")
     
-    def upload_apps(self, df: pd.DataFrame):
+    def upload_apps(self, df: 'pd.DataFrame'):
         """Upload apps DataFrame to BigQuery, replacing all existing data."""
         table_id = f"{self.project_id}.{self.dataset}.{self.apps_table}"
-        
-        # Define schema to ensure proper types (especially FLOAT for arr)
-        schema = [
-            bigquery.SchemaField("task_id", "STRING", mode="REQUIRED"),
-            bigquery.SchemaField("application_name", "STRING"),
-            bigquery.SchemaField("account_task_ids", "STRING"),
-            bigquery.SchemaField("arr", "FLOAT"),
-            bigquery.SchemaField("last_updated", "TIMESTAMP"),
-            bigquery.SchemaField("status", "STRING"),
-            bigquery.SchemaField("maintenance", "BOOLEAN"),
-        ]
-        
-        job_config = bigquery.LoadJobConfig(
-            write_disposition="WRITE_TRUNCATE",
-            schema=schema  # Explicitly set schema
-        )
-        
-        job = self.client.load_table_from_dataframe(df, table_id, job_config=job_config)
-        job.result()
+        self._load_dataframe(df, table_id, self.SCHEMA)
         
         logger.info(f"Uploaded {len(df)} applications to {table_id}")
 
 
-class BigQueryManager:
+# Time entry fact table; staging holds the same columns minus the derived ones
+FACT_SCHEMA = [
+    bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("start_utc", "TIMESTAMP"),
+    bigquery.SchemaField("end_utc", "TIMESTAMP"),
+    bigquery.SchemaField("duration_ms", "INTEGER"),
+    bigquery.SchemaField("duration_hours", "FLOAT"),
+    bigquery.SchemaField("billable", "BOOLEAN"),
+    bigquery.SchemaField("description", "STRING"),
+    bigquery.SchemaField("source", "STRING"),
+    bigquery.SchemaField("at", "TIMESTAMP"),
+    bigquery.SchemaField("is_locked", "BOOLEAN"),
+    bigquery.SchemaField("approval_id", "STRING"),
+    bigquery.SchemaField("task_url", "STRING"),
+    bigquery.SchemaField("task_id", "STRING"),
+    bigquery.SchemaField("task_name", "STRING"),
+    bigquery.SchemaField("task_custom_type", "STRING"),
+    bigquery.SchemaField("task_custom_id", "STRING"),
+    bigquery.SchemaField("task_status_status", "STRING"),
+    bigquery.SchemaField("task_status_color", "STRING"),
+    bigquery.SchemaField("task_status_type", "STRING"),
+    bigquery.SchemaField("task_status_orderindex", "INTEGER"),
+    bigquery.SchemaField("user_id", "STRING"),
+    bigquery.SchemaField("user_username", "STRING"),
+    bigquery.SchemaField("user_email", "STRING"),
+    bigquery.SchemaField("user_email_sha256", "STRING"),
+    bigquery.SchemaField("user_color", "STRING"),
+    bigquery.SchemaField("user_initials", "STRING"),
+    bigquery.SchemaField("user_profilePicture", "STRING"),
+    bigquery.SchemaField("task_location_list_id", "STRING"),
+    bigquery.SchemaField("task_location_folder_id", "STRING"),
+    bigquery.SchemaField("task_location_space_id", "STRING"),
+    bigquery.SchemaField("start_date_oslo", "DATE"),
+]
+
+# Computed in the MERGE from staging columns rather than client-side per row
+# (BigQuery has no generated columns, so the fact table stores them physically)
+FACT_DERIVED_COLUMNS = {
+    "start_date_oslo": 'DATE(S.start_utc, "Europe/Oslo")',
+}
+
+STAGING_SCHEMA = [field for field in FACT_SCHEMA if field.name not in FACT_DERIVED_COLUMNS]
+
+# Each run loads into its own staging table; the expiry cleans up after
+# runs that die before dropping it
+STAGING_TABLE_TTL = timedelta(hours=6)
+
+FACT_PARTITION_FIELD = "start_date_oslo"
+FACT_CLUSTERING_FIELDS = ["user_id", "task_id"]
+
+
+def _build_merge_sql(source: str, delete_window: str = '') -> str:
+    """
+    Build a MERGE of staging into the fact table from FACT_SCHEMA.
+    
+    Rows always match on id alone; a range predicate in ON would turn an
+    entry moved into the window into a duplicate insert. delete_window
+    restricts the NOT MATCHED BY SOURCE delete instead. The result keeps
+    {fact} and {staging} placeholders for the table ids.
+    """
+    columns = [field.name for field in FACT_SCHEMA]
+    values = {c: FACT_DERIVED_COLUMNS.get(c, f"S.`{c}`") for c in columns}
+    update_set = ",\n          ".join(f"`{c}` = {values[c]}" for c in columns if c != 'id')
+    insert_columns = ", ".join(f"`{c}`" for c in columns)
+    insert_values = ", ".join(values[c] for c in columns)
+    return f"""
+        MERGE `{{fact}}` T
+        USING {source} S
+        ON T.id = S.id
+        WHEN MATCHED THEN UPDATE SET
+          {update_set}
+        WHEN NOT MATCHED THEN
+          INSERT ({insert_columns})
+          VALUES ({insert_values})
+        WHEN NOT MATCHED BY SOURCE{delete_window} THEN
+          DELETE;
+        """
+
+
+_REFRESH_WINDOW = """BETWEEN DATE_SUB(CURRENT_DATE("Europe/Oslo"), INTERVAL refresh_days DAY)
+                                   AND CURRENT_DATE("Europe/Oslo")"""
+
+# MERGE statements are generated once at import; only the table ids vary per run
+MERGE_REFRESH_SQL = "\n        DECLARE refresh_days INT64 DEFAULT @days;\n" + _build_merge_sql(
+    source=f"""(
+          SELECT * FROM `{{staging}}`
+          WHERE DATE(start_utc, "Europe/Oslo") {_REFRESH_WINDOW}
+        )""",
+    # Matching stays on id alone, so an entry moved into the window from
+    # outside it updates its existing row; only the delete is windowed. An
+    # entry can move from any date, so no date bound on the target is safe in
+    # ON, and the MERGE reads the whole fact table (partitioning doesn't cut
+    # its bytes; it serves date-filtered reads of the fact table)
+    delete_window=f"\n          AND T.start_date_oslo {_REFRESH_WINDOW}\n       "
+)
+MERGE_FULL_REINDEX_SQL = _build_merge_sql(source="`{staging}`")
+
+
+class BigQueryManager(_BQBase):
     """Manages BigQuery operations for time entries data."""
     
-    def __init__(self, project_id: str, dataset: str, staging_table: str, fact_table: str):
+    def __init__(self, project_id: str, dataset: str, staging_table: str, fact_table: str,
+                 client: Optional[bigquery.Client] = None):
         self.project_id = project_id
         self.dataset = dataset
         self.staging_table = staging_table
         self.fact_table = fact_table
-        self.client = bigquery.Client(project=project_id)
-        
-    def ensure_dataset_exists(self):
-        """Ensure the dataset exists."""
-        dataset_id = f"{self.project_id}.{self.dataset}"
-        try:
-            self.client.get_dataset(dataset_id)
-            logger.info(f"Dataset {dataset_id} already exists")
-        except NotFound:
-            dataset = bigquery.Dataset(dataset_id)
-            dataset.location = "US"  # Set location as needed
-            dataset = self.client.create_dataset(dataset, timeout=30)
-            logger.info(f"Created dataset {dataset_id}")
+        self.client = client or get_bigquery_client(project_id)
     
-    def create_staging_table(self, df: pd.DataFrame):
-        """Create or recreate staging table with proper schema."""
+    def create_staging_table(self):
+        """Create the staging table with proper schema, expiring after STAGING_TABLE_TTL."""
         table_id = f"{self.project_id}.{self.dataset}.{self.staging_table}"
         
-        # Define schema based on DataFrame
-        schema = [
-            bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-            bigquery.SchemaField("start_utc", "TIMESTAMP"),
-            bigquery.SchemaField("end_utc", "TIMESTAMP"),
-            bigquery.SchemaField("duration_ms", "INTEGER"),
-            bigquery.SchemaField("duration_hours", "FLOAT"),
-            bigquery.SchemaField("billable", "BOOLEAN"),
-            bigquery.SchemaField("description", "STRING"),
-            bigquery.SchemaField("source", "STRING"),
-            bigquery.SchemaField("at", "TIMESTAMP"),
-            bigquery.SchemaField("is_locked", "BOOLEAN"),
-            bigquery.SchemaField("approval_id", "STRING"),
-            bigquery.SchemaField("task_url", "STRING"),
-            bigquery.SchemaField("task_id", "STRING"),
-            bigquery.SchemaField("task_name", "STRING"),
-            bigquery.SchemaField("task_custom_type", "STRING"),
-            bigquery.SchemaField("task_custom_id", "STRING"),
-            bigquery.SchemaField("task_status_status", "STRING"),
-            bigquery.SchemaField("task_status_color", "STRING"),
-            bigquery.SchemaField("task_status_type", "STRING"),
-            bigquery.SchemaField("task_status_orderindex", "INTEGER"),
-            bigquery.SchemaField("user_id", "STRING"),
-            bigquery.SchemaField("user_username", "STRING"),
-            bigquery.SchemaField("user_email", "STRING"),
-            bigquery.SchemaField("user_email_sha256", "STRING"),
-            bigquery.SchemaField("user_color", "STRING"),
-            bigquery.SchemaField("user_initials", "STRING"),
-            bigquery.SchemaField("user_profilePicture", "STRING"),
-            bigquery.SchemaField("task_location_list_id", "STRING"),
-            bigquery.SchemaField("task_location_folder_id", "STRING"),
-            bigquery.SchemaField("task_location_space_id", "STRING"),
-            bigquery.SchemaField("start_date_oslo", "DATE")
-        ]
-        
-        table = bigquery.Table(table_id, schema=schema)
+        table = bigquery.Table(table_id, schema=STAGING_SCHEMA)
+        table.expires = datetime.now(timezone.utc) + STAGING_TABLE_TTL
         table = self.client.create_table(table, exists_ok=True)
         logger.info(f"Staging table {table_id} ready")
     
-    def upload_to_staging(self, df: pd.DataFrame):
-        """Upload DataFrame to staging table."""
+    def drop_staging_table(self):
+        """Drop the staging table; failures are logged, since it expires anyway."""
         table_id = f"{self.project_id}.{self.dataset}.{self.staging_table}"
         
-        # Ensure proper data types for BigQuery
-        df_upload = df.copy()
+        try:
+            self.client.delete_table(table_id, not_found_ok=True)
+            logger.info(f"Dropped staging table {table_id}")
+        except Exception as e:
+            logger.warning(f"Could not drop staging table {table_id}: {e}")
+    
+    def upload_to_staging(self, parquet_path: str, gcs_bucket: Optional[str] = None):
+        """
+        Load a Parquet file of transformed entries into the staging table.
         
-        # Convert nullable integers
-        df_upload['duration_ms'] = df_upload['duration_ms'].astype('Int64')
-        df_upload['task_status_orderindex'] = df_upload['task_status_orderindex'].astype('Int64')
+        This is a single WRITE_TRUNCATE load job that is waited on before
+        returning, so the rows are immediately visible to the MERGE (streaming
+        inserts would sit in the streaming buffer and block DML).
         
-        job_config = bigquery.LoadJobConfig(
-            write_disposition="WRITE_TRUNCATE"
-        )
+        With gcs_bucket the file is uploaded to gs://<bucket>/staging/ and
+        loaded from there with load_table_from_uri; the object is deleted once
+        the load succeeds.
+        """
+        table_id = f"{self.project_id}.{self.dataset}.{self.staging_table}"
         
-        job = self.client.load_table_from_dataframe(df_upload, table_id, job_config=job_config)
-        job.result()  # Wait for job to complete
+        if gcs_bucket:
+            from google.cloud import storage
+            
+            blob = storage.Client(project=self.project_id).bucket(gcs_bucket).blob(
+                f"staging/{self.staging_table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+            )
+            blob.upload_from_filename(parquet_path)
+            try:
+                job = self._load_parquet_uri(f"gs://{gcs_bucket}/{blob.name}", table_id, STAGING_SCHEMA)
+            finally:
+                blob.delete()
+        else:
+            with open(parquet_path, 'rb') as parquet_file:
+                job = self._load_parquet(parquet_file, table_id, STAGING_SCHEMA)
         
-        logger.info(f"Uploaded {len(df_upload)} rows to staging table")
+        logger.info(f"Uploaded {job.output_rows} rows to staging table")
+    
+    def _staging_is_empty(self) -> bool:
+        """Check the staging row count from table metadata (no query, no bytes billed)."""
+        table = self.client.get_table(f"{self.project_id}.{self.dataset}.{self.staging_table}")
+        return not table.num_rows
     
     def merge_refresh_mode(self, days: int):
-        """Execute MERGE in refresh mode with windowed delete."""
-        query = f"""
-        DECLARE refresh_days INT64 DEFAULT @days;
-
-        MERGE `{self.project_id}.{self.dataset}.{self.fact_table}` T
-        USING (
-          SELECT * FROM `{self.project_id}.{self.dataset}.{self.staging_table}`
-          WHERE start_date_oslo BETWEEN DATE_SUB(CURRENT_DATE("Europe/Oslo"), INTERVAL refresh_days DAY)
-                                   AND CURRENT_DATE("Europe/Oslo")
-        ) S
-        ON T.id = S.id
-        WHEN MATCHED THEN UPDATE SET
-          start_utc = S.start_utc,
-          end_utc = S.end_utc,
-          duration_ms = S.duration_ms,
-          duration_hours = S.duration_hours,
-          billable = S.billable,
-          description = S.description,
-          source = S.source,
-          `at` = S.`at`,
-          is_locked = S.is_locked,
-          approval_id = S.approval_id,
-          task_url = S.task_url,
-          task_id = S.task_id,
-          task_name = S.task_name,
-          task_custom_type = S.task_custom_type,
-          task_custom_id = S.task_custom_id,
-          task_status_status = S.task_status_status,
-          task_status_color = S.task_status_color,
-          task_status_type = S.task_status_type,
-          task_status_orderindex = S.task_status_orderindex,
-          user_id = S.user_id,
-          user_username = S.user_username,
-          user_email = S.user_email,
-          user_email_sha256 = S.user_email_sha256,
-          user_color = S.user_color,
-          user_initials = S.user_initials,
-          user_profilePicture = S.user_profilePicture,
-          task_location_list_id = S.task_location_list_id,
-          task_location_folder_id = S.task_location_folder_id,
-          task_location_space_id = S.task_location_space_id,
-          start_date_oslo = S.start_date_oslo
-        WHEN NOT MATCHED THEN
-          INSERT ROW
-        WHEN NOT MATCHED BY SOURCE
-          AND T.start_date_oslo BETWEEN DATE_SUB(CURRENT_DATE("Europe/Oslo"), INTERVAL refresh_days DAY)
-                                    AND CURRENT_DATE("Europe/Oslo")
-        THEN DELETE;
         """
+        Execute MERGE in refresh mode with windowed delete.
+        
+        This also runs with an empty staging table: the delete still removes
+        fact rows in the window for entries deleted in ClickUp.
+        """
+        query = MERGE_REFRESH_SQL.format(
+            fact=f"{self.project_id}.{self.dataset}.{self.fact_table}",
+            staging=f"{self.project_id}.{self.dataset}.{self.staging_table}"
+        )
         
         job_config = bigquery.QueryJobConfig(
             query_parameters=[
@@ -1334,64 +1765,15 @@ class BigQueryManager:
     
     def merge_full_reindex_mode(self):
         """Execute MERGE in full reindex mode."""
-        query = f"""
-        MERGE `{self.project_id}.{self.dataset}.{self.fact_table}` T
-        USING `{self.project_id}.{self.dataset}.{self.staging_table}` S
-        ON T.id = S.id
-        WHEN MATCHED THEN UPDATE SET
-          start_utc = S.start_utc,
-          end_utc = S.end_utc,
-          duration_ms = S.duration_ms,
-          duration_hours = S.duration_hours,
-          billable = S.billable,
-          description = S.description,
-          source = S.source,
-          `at` = S.`at`,
-          is_locked = S.is_locked,
-          approval_id = S.approval_id,
-          task_url = S.task_url,
-          task_id = S.task_id,
-          task_name = S.task_name,
-          task_custom_type = S.task_custom_type,
-          task_custom_id = S.task_custom_id,
-          task_status_status = S.task_status_status,
-          task_status_color = S.task_status_color,
-          task_status_type = S.task_status_type,
-          task_status_orderindex = S.task_status_orderindex,
-          user_id = S.user_id,
-          user_username = S.user_username,
-          user_email = S.user_email,
-          user_email_sha256 = S.user_email_sha256,
-          user_color = S.user_color,
-          user_initials = S.user_initials,
-          user_profilePicture = S.user_profilePicture,
-          task_location_list_id = S.task_location_list_id,
-          task_location_folder_id = S.task_location_folder_id,
-          task_location_space_id = S.task_location_space_id,
-          start_date_oslo = S.start_date_oslo
-        WHEN NOT MATCHED THEN
-          INSERT (
-            id, start_utc, end_utc, duration_ms, duration_hours, billable, description,
-            source, `at`, is_locked, approval_id, task_url, task_id, task_name,
-            task_custom_type, task_custom_id, task_status_status, task_status_color,
-            task_status_type, task_status_orderindex, user_id, user_username, user_email,
-            user_email_sha256, user_color, user_initials, user_profilePicture,
-            task_location_list_id, task_location_folder_id, task_location_space_id,
-            start_date_oslo
-          )
-          VALUES (
-            S.id, S.start_utc, S.end_utc, S.duration_ms, S.duration_hours, S.billable,
-            S.description, S.source, S.`at`, S.is_locked, S.approval_id, S.task_url,
-            S.task_id, S.task_name, S.task_custom_type, S.task_custom_id,
-            S.task_status_status, S.task_status_color, S.task_status_type,
-            S.task_status_orderindex, S.user_id, S.user_username, S.user_email,
-            S.user_email_sha256, S.user_color, S.user_initials, S.user_profilePicture,
-            S.task_location_list_id, S.task_location_folder_id, S.task_location_space_id,
-            S.start_date_oslo
-          )
-        WHEN NOT MATCHED BY SOURCE THEN
-          DELETE;
-        """
+        # An empty staging table would otherwise delete every fact row
+        if self._staging_is_empty():
+            logger.error("Staging table is empty; refusing to run the full reindex MERGE")
+            raise RuntimeError("Full reindex staging table is empty; the fact table was left unchanged")
+        
+        query = MERGE_FULL_REINDEX_SQL.format(
+            fact=f"{self.project_id}.{self.dataset}.{self.fact_table}",
+            staging=f"{self.project_id}.{self.dataset}.{self.staging_table}"
+        )
         
         job = self.client.query(query)
         job.result()
@@ -1403,88 +1785,95 @@ class BigQueryManager:
         table_id = f"{self.project_id}.{self.dataset}.{self.fact_table}"
         
         try:
-            self.client.get_table(table_id)
+            table = self.client.get_table(table_id)
             logger.info(f"Fact table {table_id} already exists")
+            if not table.time_partitioning:
+                # Without partitions the windowed refresh MERGE scans the whole table
+                logger.warning(
+                    f"Fact table {table_id} is not partitioned on {FACT_PARTITION_FIELD}; "
+                    f"run once with --repartition_fact_table to enable partition pruning"
+                )
         except NotFound:
-            # Create table with same schema as staging
-            schema = [
-                bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("start_utc", "TIMESTAMP"),
-                bigquery.SchemaField("end_utc", "TIMESTAMP"),
-                bigquery.SchemaField("duration_ms", "INTEGER"),
-                bigquery.SchemaField("duration_hours", "FLOAT"),
-                bigquery.SchemaField("billable", "BOOLEAN"),
-                bigquery.SchemaField("description", "STRING"),
-                bigquery.SchemaField("source", "STRING"),
-                bigquery.SchemaField("at", "TIMESTAMP"),
-                bigquery.SchemaField("is_locked", "BOOLEAN"),
-                bigquery.SchemaField("approval_id", "STRING"),
-                bigquery.SchemaField("task_url", "STRING"),
-                bigquery.SchemaField("task_id", "STRING"),
-                bigquery.SchemaField("task_name", "STRING"),
-                bigquery.SchemaField("task_custom_type", "STRING"),
-                bigquery.SchemaField("task_custom_id", "STRING"),
-                bigquery.SchemaField("task_status_status", "STRING"),
-                bigquery.SchemaField("task_status_color", "STRING"),
-                bigquery.SchemaField("task_status_type", "STRING"),
-                bigquery.SchemaField("task_status_orderindex", "INTEGER"),
-                bigquery.SchemaField("user_id", "STRING"),
-                bigquery.SchemaField("user_username", "STRING"),
-                bigquery.SchemaField("user_email", "STRING"),
-                bigquery.SchemaField("user_email_sha256", "STRING"),
-                bigquery.SchemaField("user_color", "STRING"),
-                bigquery.SchemaField("user_initials", "STRING"),
-                bigquery.SchemaField("user_profilePicture", "STRING"),
-                bigquery.SchemaField("task_location_list_id", "STRING"),
-                bigquery.SchemaField("task_location_folder_id", "STRING"),
-                bigquery.SchemaField("task_location_space_id", "STRING"),
-                bigquery.SchemaField("start_date_oslo", "DATE")
-            ]
-            
-            table = bigquery.Table(table_id, schema=schema)
+            # Create table partitioned by Oslo date and clustered so MERGE
+            # only scans the partitions it touches
+            table = bigquery.Table(table_id, schema=FACT_SCHEMA)
+            table.time_partitioning = bigquery.TimePartitioning(
+                type_=bigquery.TimePartitioningType.DAY,
+                field=FACT_PARTITION_FIELD
+            )
+            table.clustering_fields = FACT_CLUSTERING_FIELDS
             table = self.client.create_table(table)
             logger.info(f"Created fact table {table_id}")
+    
+    def repartition_fact_table(self):
+        """Recreate an existing unpartitioned fact table with partitioning and clustering."""
+        table_id = f"{self.project_id}.{self.dataset}.{self.fact_table}"
+        
+        table = self.client.get_table(table_id)
+        if table.time_partitioning and table.clustering_fields:
+            logger.info(f"Fact table {table_id} is already partitioned and clustered")
+            return
+        
+        # Partitioning can't be added in place, so copy into a new table and swap
+        # it in. BigQuery transactions don't cover DDL, so the original is renamed
+        # aside and only dropped once the copy has taken its name; if that rename
+        # fails, the original is renamed back.
+        query = f"""
+        CREATE OR REPLACE TABLE `{table_id}__repartitioned`
+        PARTITION BY {FACT_PARTITION_FIELD}
+        CLUSTER BY {', '.join(FACT_CLUSTERING_FIELDS)}
+        AS SELECT * FROM `{table_id}`;
+
+        ALTER TABLE `{table_id}` RENAME TO `{self.fact_table}__backup`;
+
+        BEGIN
+          ALTER TABLE `{table_id}__repartitioned` RENAME TO `{self.fact_table}`;
+        EXCEPTION WHEN ERROR THEN
+          ALTER TABLE `{table_id}__backup` RENAME TO `{self.fact_table}`;
+          RAISE;
+        END;
+
+        DROP TABLE `{table_id}__backup`;
+        """
+        
+        job = self.client.query(query)
+        job.result()
+        
+        logger.info(f"Repartitioned fact table {table_id}")
 
 
-def sync_lists_to_bigquery():
+def sync_lists_to_bigquery(cfg: Optional[Config] = None, session: Optional[requests.Session] = None):
     """Fetch ClickUp lists and sync to BigQuery."""
-    clickup_token = os.getenv('CLICKUP_TOKEN')
-    team_id = os.getenv('TEAM_ID')
-    project_id = os.getenv('PROJECT_ID', 'nettsmed-internal')
-    dataset = os.getenv('DATASET', 'clickup_data')
-    lists_table = os.getenv('LISTS_TABLE', 'dim_lists')
+    import pandas as pd
+    
+    cfg = cfg or Config.from_env()
     
-    if not clickup_token:
+    if not cfg.clickup_token:
         logger.error("CLICKUP_TOKEN environment variable is required")
-        sys.exit(1)
+        raise ValueError("CLICKUP_TOKEN environment variable is required")
     
-    if not team_id:
+    if not cfg.team_id:
         logger.error("TEAM_ID environment variable is required")
-        sys.exit(1)
+        raise ValueError("TEAM_ID environment variable is required")
     
     logger.info("Starting ClickUp lists sync to BigQuery")
-    logger.info(f"Project: {project_id}, Dataset: {dataset}, Table: {lists_table}")
+    logger.info(f"Project: {cfg.project_id}, Dataset: {cfg.dataset}, Table: {cfg.lists_table}")
     
     try:
         # Initialize components
-        fetcher = ClickUpListsFetcher(clickup_token, team_id)
-        bq_manager = BigQueryListsManager(project_id, dataset, lists_table)
+        fetcher = ClickUpListsFetcher(cfg.clickup_token, cfg.team_id, session)
+        bq_manager = BigQueryListsManager(cfg.project_id, cfg.dataset, cfg.lists_table)
         
         # Fetch lists
         logger.info("Fetching lists from ClickUp...")
-        lists_data = fetcher.fetch_all_lists()
+        with fetcher:
+            lists_data = fetcher.fetch_all_lists()
         
         if not lists_data:
             logger.warning("No lists found")
             return
         
-        # Create DataFrame
-        df = pd.DataFrame(lists_data)
-        
-        # Save CSV for backup
-        csv_filename = f"clickup_lists_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(csv_filename, index=False)
-        logger.info(f"Saved {len(df)} lists to {csv_filename}")
+        columns = [field.name for field in bq_manager.SCHEMA]
         
         # BigQuery operations
         logger.info("Setting up BigQuery...")
@@ -1492,51 +1881,52 @@ def sync_lists_to_bigquery():
         bq_manager.create_lists_table_if_not_exists()
         
         logger.info("Uploading lists to BigQuery...")
-        bq_manager.upload_lists(df)
+        df = pd.DataFrame.from_records(iter(lists_data), columns=columns, nrows=len(lists_data))
+        del lists_data
+        
+        # Write the backup on a side thread while the network-bound upload runs
+        with ThreadPoolExecutor(max_workers=1) as backup_executor:
+            backup = backup_executor.submit(save_backup, df, "clickup_lists", cfg.backup_format, cfg.backup_dir)
+            bq_manager.upload_lists(df)
+            backup_path = backup.result()
+        if backup_path:
+            logger.info(f"Saved {len(df)} lists to {backup_path}")
         
         logger.info("Lists sync completed successfully!")
         
     except Exception as e:
         logger.error(f"Lists sync failed: {e}")
-        sys.exit(1)
+        raise
 
 
-def sync_tasks_to_bigquery():
+def sync_tasks_to_bigquery(cfg: Optional[Config] = None, session: Optional[requests.Session] = None):
     """Fetch ClickUp tasks and sync to BigQuery."""
-    clickup_token = os.getenv('CLICKUP_TOKEN')
-    space_id = os.getenv('SPACE_ID', '61463579')  # Billable work space
-    project_id = os.getenv('PROJECT_ID', 'nettsmed-internal')
-    dataset = os.getenv('DATASET', 'clickup_data')
-    tasks_table = os.getenv('TASKS_TABLE', 'dim_tasks')
+    import pandas as pd
     
-    if not clickup_token:
-        logger.error("CLICKUP_TOKEN environment variable is required")
-        sys.exit(1)
+    cfg = cfg or Config.from_env()
+    
+    if not cfg.clickup_token:
+        raise ValueError("CLICKUP_TOKEN environment variable is required")
     
     logger.info("Starting ClickUp tasks sync to BigQuery")
-    logger.info(f"Project: {project_id}, Dataset: {dataset}, Table: {tasks_table}")
-    logger.info(f"Space ID: {space_id}")
+    logger.info(f"Project: {cfg.project_id}, Dataset: {cfg.dataset}, Table: {cfg.tasks_table}")
+    logger.info(f"Space ID: {cfg.space_id}")
     
     try:
         # Initialize components
-        fetcher = ClickUpTasksFetcher(clickup_token, space_id)
-        bq_manager = BigQueryTasksManager(project_id, dataset, tasks_table)
+        fetcher = ClickUpTasksFetcher(cfg.clickup_token, cfg.space_id, session)
+        bq_manager = BigQueryTasksManager(cfg.project_id, cfg.dataset, cfg.tasks_table)
         
         # Fetch tasks
         logger.info("Fetching tasks from ClickUp...")
-        tasks_data = fetcher.fetch_all_tasks()
+        with fetcher:
+            tasks_data = fetcher.fetch_all_tasks()
         
         if not tasks_data:
             logger.warning("No tasks found")
             return
         
-        # Create DataFrame
-        df = pd.DataFrame(tasks_data)
-        
-        # Save CSV for backup
-        csv_filename = f"clickup_tasks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(csv_filename, index=False)
-        logger.info(f"Saved {len(df)} tasks to {csv_filename}")
+        columns = [field.name for field in bq_manager.SCHEMA]
         
         # BigQuery operations
         logger.info("Setting up BigQuery...")
@@ -1544,57 +1934,55 @@ def sync_tasks_to_bigquery():
         bq_manager.create_tasks_table_if_not_exists()
         
         logger.info("Uploading tasks to BigQuery...")
-        bq_manager.upload_tasks(df)
+        df = pd.DataFrame.from_records(iter(tasks_data), columns=columns, nrows=len(tasks_data))
+        del tasks_data
+        
+        # Write the backup on a side thread while the network-bound upload runs
+        with ThreadPoolExecutor(max_workers=1) as backup_executor:
+            backup = backup_executor.submit(save_backup, df, "clickup_tasks", cfg.backup_format, cfg.backup_dir)
+            bq_manager.upload_tasks(df)
+            backup_path = backup.result()
+        if backup_path:
+            logger.info(f"Saved {len(df)} tasks to {backup_path}")
         
         logger.info("Tasks sync completed successfully!")
         
     except Exception as e:
         logger.error(f"Tasks sync failed: {e}")
-        sys.exit(1)
+        raise
 
 
-def sync_accounts_to_bigquery():
+def sync_accounts_to_bigquery(cfg: Optional[Config] = None, session: Optional[requests.Session] = None):
     """Fetch ClickUp accounts and sync to BigQuery."""
-    clickup_token = os.getenv('CLICKUP_TOKEN')
-    list_id = os.getenv('ACCOUNTS_LIST_ID', '901506402026')
-    connected_cf_id = os.getenv('CONNECTED_CF_ID', '00aeeab8-926e-4c46-8299-99f973287b6e')
-    hours_discount_cf_id = os.getenv('HOURS_DISCOUNT_CF_ID', '2617cb32-785f-48ba-974a-1468c66e9166')
-    arr_cf_id = os.getenv('ARR_CF_ID', '93ed8859-06ad-4909-938c-70b6f4c8352a')
-    project_id = os.getenv('PROJECT_ID', 'nettsmed-internal')
-    dataset = os.getenv('DATASET', 'clickup_data')
-    accounts_table = os.getenv('ACCOUNTS_TABLE', 'dim_accounts')
-    
-    if not clickup_token:
-        logger.error("CLICKUP_TOKEN environment variable is required")
-        sys.exit(1)
+    import pandas as pd
+    
+    cfg = cfg or Config.from_env()
+    
+    if not cfg.clickup_token:
+        raise ValueError("CLICKUP_TOKEN environment variable is required")
     
     logger.info("Starting ClickUp accounts sync to BigQuery")
-    logger.info(f"Project: {project_id}, Dataset: {dataset}, Table: {accounts_table}")
-    logger.info(f"List ID: {list_id}")
+    logger.info(f"Project: {cfg.project_id}, Dataset: {cfg.dataset}, Table: {cfg.accounts_table}")
+    logger.info(f"List ID: {cfg.accounts_list_id}")
     
     try:
         # Initialize components
         fetcher = ClickUpAccountsFetcher(
-            clickup_token, list_id,
-            connected_cf_id, hours_discount_cf_id, arr_cf_id
+            cfg.clickup_token, cfg.accounts_list_id,
+            cfg.connected_cf_id, cfg.hours_discount_cf_id, cfg.arr_cf_id, session
         )
-        bq_manager = BigQueryAccountsManager(project_id, dataset, accounts_table)
+        bq_manager = BigQueryAccountsManager(cfg.project_id, cfg.dataset, cfg.accounts_table)
         
         # Fetch accounts
         logger.info("Fetching accounts from ClickUp...")
-        accounts_data = fetcher.fetch_all_accounts()
+        with fetcher:
+            accounts_data = fetcher.fetch_all_accounts()
         
         if not accounts_data:
             logger.warning("No accounts found")
             return
         
-        # Create DataFrame
-        df = pd.DataFrame(accounts_data)
-        
-        # Save CSV for backup
-        csv_filename = f"clickup_accounts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(csv_filename, index=False)
-        logger.info(f"Saved {len(df)} account rows to {csv_filename}")
+        columns = [field.name for field in bq_manager.SCHEMA]
         
         # BigQuery operations
         logger.info("Setting up BigQuery...")
@@ -1602,62 +1990,58 @@ def sync_accounts_to_bigquery():
         bq_manager.create_accounts_table_if_not_exists()
         
         logger.info("Uploading accounts to BigQuery...")
-        bq_manager.upload_accounts(df)
+        df = pd.DataFrame.from_records(iter(accounts_data), columns=columns, nrows=len(accounts_data))
+        del accounts_data
+        
+        # Write the backup on a side thread while the network-bound upload runs
+        with ThreadPoolExecutor(max_workers=1) as backup_executor:
+            backup = backup_executor.submit(save_backup, df, "clickup_accounts", cfg.backup_format, cfg.backup_dir)
+            bq_manager.upload_accounts(df)
+            backup_path = backup.result()
+        if backup_path:
+            logger.info(f"Saved {len(df)} account rows to {backup_path}")
         
         logger.info("Accounts sync completed successfully!")
         
     except Exception as e:
         logger.error(f"Accounts sync failed: {e}")
-        sys.exit(1)
+        raise
 
 
-def sync_apps_to_bigquery():
+def sync_apps_to_bigquery(cfg: Optional[Config] = None, session: Optional[requests.Session] = None):
     """Fetch ClickUp applications and sync to BigQuery."""
-    clickup_token = os.getenv('CLICKUP_TOKEN')
-    team_id = os.getenv('TEAM_ID')
-    arr_cf_id = os.getenv('ARR_CF_ID', '93ed8859-06ad-4909-938c-70b6f4c8352a')
-    last_updated_cf_id = os.getenv('LAST_UPDATED_CF_ID', '203398a3-0a22-47b2-9ab9-8b838032f58e')
-    maintenance_cf_id = os.getenv('MAINTENANCE_CF_ID', '1a9472e3-46e0-4cd3-88c5-587efaab0320')
-    accounts_rel_cf_id = os.getenv('ACCOUNTS_REL_CF_ID', '9ac424ac-f78f-47ab-89c0-9b5540fee5c5')
-    project_id = os.getenv('PROJECT_ID', 'nettsmed-internal')
-    dataset = os.getenv('DATASET', 'clickup_data')
-    apps_table = os.getenv('APPS_TABLE', 'dim_apps')
-    
-    if not clickup_token:
-        logger.error("CLICKUP_TOKEN environment variable is required")
-        sys.exit(1)
+    import pandas as pd
     
-    if not team_id:
-        logger.error("TEAM_ID environment variable is required")
-        sys.exit(1)
+    cfg = cfg or Config.from_env()
+    
+    if not cfg.clickup_token:
+        raise ValueError("CLICKUP_TOKEN environment variable is required")
+    
+    if not cfg.team_id:
+        raise ValueError("TEAM_ID environment variable is required")
     
     logger.info("Starting ClickUp applications sync to BigQuery")
-    logger.info(f"Project: {project_id}, Dataset: {dataset}, Table: {apps_table}")
-    logger.info(f"Team ID: {team_id}")
+    logger.info(f"Project: {cfg.project_id}, Dataset: {cfg.dataset}, Table: {cfg.apps_table}")
+    logger.info(f"Team ID: {cfg.team_id}")
     
     try:
         # Initialize components
         fetcher = ClickUpAppsFetcher(
-            clickup_token, team_id,
-            arr_cf_id, last_updated_cf_id, maintenance_cf_id, accounts_rel_cf_id
+            cfg.clickup_token, cfg.team_id,
+            cfg.arr_cf_id, cfg.last_updated_cf_id, cfg.maintenance_cf_id, cfg.accounts_rel_cf_id, session
         )
-        bq_manager = BigQueryAppsManager(project_id, dataset, apps_table)
+        bq_manager = BigQueryAppsManager(cfg.project_id, cfg.dataset, cfg.apps_table)
         
         # Fetch apps
         logger.info("Fetching applications from ClickUp...")
-        apps_data = fetcher.fetch_all_apps()
+        with fetcher:
+            apps_data = fetcher.fetch_all_apps()
         
         if not apps_data:
             logger.warning("No applications found")
             return
         
-        # Create DataFrame
-        df = pd.DataFrame(apps_data)
-        
-        # Save CSV for backup
-        csv_filename = f"clickup_apps_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(csv_filename, index=False)
-        logger.info(f"Saved {len(df)} applications to {csv_filename}")
+        columns = [field.name for field in bq_manager.SCHEMA]
         
         # BigQuery operations
         logger.info("Setting up BigQuery...")
@@ -1665,17 +2049,210 @@ def sync_apps_to_bigquery():
         bq_manager.create_apps_table_if_not_exists()
         
         logger.info("Uploading applications to BigQuery...")
-        bq_manager.upload_apps(df)
+        df = pd.DataFrame.from_records(iter(apps_data), columns=columns, nrows=len(apps_data))
+        del apps_data
+        
+        # Write the backup on a side thread while the network-bound upload runs
+        with ThreadPoolExecutor(max_workers=1) as backup_executor:
+            backup = backup_executor.submit(save_backup, df, "clickup_apps", cfg.backup_format, cfg.backup_dir)
+            bq_manager.upload_apps(df)
+            backup_path = backup.result()
+        if backup_path:
+            logger.info(f"Saved {len(df)} applications to {backup_path}")
         
         logger.info("Applications sync completed successfully!")
         
     except Exception as e:
         logger.error(f"Applications sync failed: {e}")
-        sys.exit(1)
+        raise
+
+
+def sync_lists_and_tasks(cfg: Optional[Config] = None, session: Optional[requests.Session] = None):
+    """
+    Sync lists, then tasks.
+    
+    Run back to back, the tasks sync walks the folder/list hierarchy from
+    HIERARCHY_CACHE as filled by the lists sync instead of fetching it again.
+    The tasks sync still runs if the lists sync fails.
+    """
+    cfg = cfg or Config.from_env()
+    
+    failed = []
+    for sync in (sync_lists_to_bigquery, sync_tasks_to_bigquery):
+        try:
+            sync(cfg, session)
+        except Exception as e:
+            logger.error(f"{sync.__name__} failed: {e}")
+            failed.append(sync.__name__)
+    
+    if failed:
+        raise RuntimeError(f"Dimension syncs failed: {', '.join(failed)}")
+
+
+# Busy-lock names (see main.py) each dimension sync covers
+DIMENSION_SYNC_KINDS = {
+    'sync_lists_and_tasks': ('lists', 'tasks'),
+    'sync_accounts_to_bigquery': ('accounts',),
+    'sync_apps_to_bigquery': ('apps',),
+}
+
+
+def _run_unless_busy(sync: Callable[..., None], locks: Dict[str, threading.Lock],
+                     cfg: Config, session: requests.Session) -> None:
+    """Run a dimension sync holding its busy locks, or skip it if one is held elsewhere."""
+    held = []
+    try:
+        for kind in DIMENSION_SYNC_KINDS[sync.__name__]:
+            if not locks[kind].acquire(blocking=False):
+                logger.info(f"Skipping {sync.__name__}: a {kind} sync is already running")
+                return
+            held.append(locks[kind])
+        sync(cfg, session)
+    finally:
+        for lock in reversed(held):
+            lock.release()
+
+
+def sync_all_dimensions(cfg: Optional[Config] = None, session: Optional[requests.Session] = None,
+                        locks: Optional[Dict[str, threading.Lock]] = None):
+    """
+    Run the lists+tasks, accounts and apps syncs concurrently over one HTTP session.
+    
+    With locks (the service's per-kind busy locks), each sync holds its locks
+    while it runs and is skipped when the same kind is already running.
+    """
+    cfg = cfg or Config.from_env()
+    syncs = (sync_lists_and_tasks, sync_accounts_to_bigquery, sync_apps_to_bigquery)
+    
+    # Each sync is an independent ClickUp -> BigQuery pipeline bound on network I/O;
+    # they share one connection pool here and one BigQuery client via get_bigquery_client
+    shared_session = session or new_clickup_session()
+    try:
+        with ThreadPoolExecutor(max_workers=len(syncs)) as executor:
+            if locks is None:
+                futures = {executor.submit(sync, cfg, shared_session): sync.__name__ for sync in syncs}
+            else:
+                futures = {
+                    executor.submit(_run_unless_busy, sync, locks, cfg, shared_session): sync.__name__
+                    for sync in syncs
+                }
+    finally:
+        if session is None:
+            shared_session.close()
+    
+    failed = []
+    for future, name in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"{name} failed: {e}")
+            failed.append(name)
+    
+    if failed:
+        raise RuntimeError(f"Dimension syncs failed: {', '.join(failed)}")
+
+
+def refresh_window_start(days: int, now: datetime) -> datetime:
+    """UTC start of the refresh window: Oslo midnight `days` days before today in Oslo."""
+    first_day = now.astimezone(OSLO_TZ).date() - timedelta(days=days)
+    return datetime.combine(first_day, datetime.min.time(), tzinfo=OSLO_TZ).astimezone(timezone.utc)
+
+
+# Incremental refresh: with SYNC_STATE_BUCKET set, a refresh only covers the
+# Oslo days since the last successful run (plus an overlap), and the full
+# REFRESH_DAYS window is re-synced at most every RECONCILE_INTERVAL to pick
+# up edits and deletions of older entries
+REFRESH_DAYS = 60
+RECONCILE_INTERVAL = timedelta(days=7)
+INCREMENTAL_OVERLAP = timedelta(hours=1)
+SYNC_STATE_BLOB = 'refresh_state.json'
+
+
+def incremental_refresh_days(state: Dict[str, str], now: datetime) -> Tuple[int, bool]:
+    """
+    Decide how many days a refresh must cover given the saved state.
+    
+    Returns:
+        (days, reconcile) where reconcile means the full REFRESH_DAYS window
+    """
+    last_success = state.get('last_success')
+    last_reconcile = state.get('last_reconcile')
+    if (not last_success or not last_reconcile
+            or now - datetime.fromisoformat(last_reconcile) >= RECONCILE_INTERVAL):
+        return REFRESH_DAYS, True
+    
+    since = (datetime.fromisoformat(last_success) - INCREMENTAL_OVERLAP).astimezone(OSLO_TZ).date()
+    # At least yesterday too, for entries stopped or edited just after midnight
+    days = max(1, (now.astimezone(OSLO_TZ).date() - since).days)
+    if days >= REFRESH_DAYS:
+        return REFRESH_DAYS, True
+    return days, False
 
 
-def main():
-    """Main function with CLI argument parsing."""
+def run_refresh(reconcile: bool = False,
+                progress_callback: Optional[Callable[[str, float], None]] = None,
+                session: Optional[requests.Session] = None,
+                cfg: Optional[Config] = None) -> int:
+    """
+    Run a refresh, incrementally when SYNC_STATE_BUCKET is set.
+    
+    The state (last_success, last_reconcile) is a small JSON object in the
+    bucket, written only after the pipeline succeeds, so a failed run (e.g.
+    a failed ClickUp chunk) leaves its days to the next one. Without a
+    bucket every run covers REFRESH_DAYS.
+    
+    Args:
+        reconcile: Cover the full REFRESH_DAYS window regardless of the state;
+            reconciles always bypass the chunk cache (CACHE_PATH)
+        cfg: Settings to run with (default: read from the environment)
+    
+    Returns:
+        Number of days refreshed
+    
+    Raises:
+        Exception: Whatever made the pipeline fail; the state is left unchanged
+    """
+    cfg = cfg or Config.from_env()
+    if not cfg.state_bucket:
+        if reconcile:
+            cfg = replace(cfg, cache_path=None)
+        main(mode='refresh', days=REFRESH_DAYS, progress_callback=progress_callback, session=session, cfg=cfg)
+        return REFRESH_DAYS
+    
+    from google.cloud import storage
+    
+    blob = storage.Client(project=cfg.project_id).bucket(cfg.state_bucket).blob(SYNC_STATE_BLOB)
+    try:
+        state = orjson.loads(blob.download_as_bytes())
+    except NotFound:
+        state = {}
+    
+    started = datetime.now(timezone.utc)
+    days, full_window = incremental_refresh_days(state, started)
+    if reconcile:
+        days, full_window = REFRESH_DAYS, True
+    logger.info(f"{'Reconciling' if full_window else 'Incremental refresh of'} the last {days} days")
+    if full_window:
+        # Cached historical chunks live for up to a week, which would hide
+        # exactly the older edits and deletions a reconcile is meant to catch
+        cfg = replace(cfg, cache_path=None)
+    
+    try:
+        main(mode='refresh', days=days, progress_callback=progress_callback, session=session, cfg=cfg)
+    except Exception:
+        logger.error(f"Refresh failed; sync state not advanced, the next run covers these {days} days again")
+        raise
+    
+    # Entries changed while this run was fetching are picked up by the next one
+    state['last_success'] = started.isoformat()
+    if full_window:
+        state['last_reconcile'] = started.isoformat()
+    blob.upload_from_string(orjson.dumps(state), content_type='application/json')
+    return days
+
+
+def build_arg_parser(cfg: Config) -> argparse.ArgumentParser:
+    """Build the CLI parser, with defaults taken from the environment config."""
     parser = argparse.ArgumentParser(description='ClickUp Time Entries to BigQuery Pipeline')
     
     parser.add_argument(
@@ -1688,120 +2265,310 @@ def main():
     parser.add_argument(
         '--days',
         type=int,
-        default=60,
-        help='Number of days to fetch in refresh mode (default: 60)'
+        default=REFRESH_DAYS,
+        help=f'Number of days to fetch in refresh mode (default: {REFRESH_DAYS})'
     )
     
     parser.add_argument(
         '--project_id',
-        default=os.getenv('PROJECT_ID', 'nettsmed-internal'),
+        default=cfg.project_id,
         help='BigQuery project ID (default: from env or nettsmed-internal)'
     )
     
     parser.add_argument(
         '--dataset',
-        default=os.getenv('DATASET', 'clickup_data'),
+        default=cfg.dataset,
         help='BigQuery dataset name (default: from env or clickup_data)'
     )
     
     parser.add_argument(
         '--staging_table',
-        default=os.getenv('STAGING_TABLE', 'staging_time_entries'),
-        help='BigQuery staging table name (default: from env or staging_time_entries)'
+        default=cfg.staging_table,
+        help='Prefix for the per-run BigQuery staging table (default: from env or staging_time_entries)'
     )
     
     parser.add_argument(
         '--fact_table',
-        default=os.getenv('FACT_TABLE', 'fact_time_entries'),
+        default=cfg.fact_table,
         help='BigQuery fact table name (default: from env or fact_time_entries)'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--backup',
+        choices=BACKUP_FORMATS,
+        default=cfg.backup_format,
+        help='Local backup format written to BACKUP_DIR (default: from env or parquet)'
+    )
     
-    # Validate required environment variables
-    clickup_token = os.getenv('CLICKUP_TOKEN')
-    team_id = os.getenv('TEAM_ID')
-    assignees_str = os.getenv('ASSIGNEES', '')
+    parser.add_argument(
+        '--always_backup',
+        action='store_true',
+        help='Write the --backup file on every run (default: only keep one when the BigQuery load fails)'
+    )
+    
+    parser.add_argument(
+        '--skip_backup',
+        action='store_true',
+        help='Never write a local backup, not even on failure (same as --backup none)'
+    )
+    
+    parser.add_argument(
+        '--cache_path',
+        default=cfg.cache_path,
+        help='SQLite file caching historical time entry chunks (default: from env, disabled)'
+    )
+    
+    parser.add_argument(
+        '--gcs_bucket',
+        default=cfg.gcs_bucket,
+        help='Stage the Parquet file in this GCS bucket and load it from there (default: from env, direct upload)'
+    )
+    
+    parser.add_argument(
+        '--repartition_fact_table',
+        action='store_true',
+        help='Recreate an existing unpartitioned fact table partitioned by start_date_oslo '
+             'and clustered by user_id, task_id before merging'
+    )
+    
+    return parser
+
+
+def main(mode: Optional[str] = None, days: Optional[int] = None,
+         argv: Optional[List[str]] = None,
+         progress_callback: Optional[Callable[[str, float], None]] = None,
+         session: Optional[requests.Session] = None,
+         cfg: Optional[Config] = None,
+         dimension_locks: Optional[Dict[str, threading.Lock]] = None):
+    """
+    Run the time entry pipeline.
+    
+    Called with a mode (as the Flask service does), settings come from cfg
+    or the environment and no arguments are parsed. Without one, CLI arguments are
+    parsed from argv (default: sys.argv[1:]).
+    
+    Args:
+        mode: 'refresh' or 'full_reindex'
+        days: Number of days to fetch in refresh mode (default: 60)
+        argv: Arguments to parse when mode is not given
+        progress_callback: Called with (phase, pct) as the run moves through
+            sync_dimensions, fetch_time_entries, transform, bigquery_setup,
+            upload, merge and done; pct goes from 0.0 to 1.0
+        session: ClickUp session to reuse (see new_clickup_session); by
+            default the run opens and closes its own
+        cfg: Settings to run with (default: read from the environment);
+            CLI flags override them
+        dimension_locks: Busy locks by sync kind for the full reindex's
+            dimension syncs (see sync_all_dimensions)
+    
+    Raises:
+        ValueError: If the mode is unknown or CLICKUP_TOKEN or TEAM_ID is missing
+        Exception: Whatever made the pipeline fail, after logging it
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    
+    cfg = cfg or Config.from_env()
+    
+    if mode is None:
+        args = build_arg_parser(cfg).parse_args(argv)
+        
+        # Command-line flags override the environment
+        cfg = replace(
+            cfg,
+            project_id=args.project_id,
+            dataset=args.dataset,
+            staging_table=args.staging_table,
+            fact_table=args.fact_table,
+            backup_format='none' if args.skip_backup else args.backup,
+            cache_path=args.cache_path,
+            gcs_bucket=args.gcs_bucket
+        )
+        mode, days = args.mode, args.days
+        always_backup_requested = args.always_backup
+        repartition = args.repartition_fact_table
+    else:
+        if mode not in ('refresh', 'full_reindex'):
+            raise ValueError(f"Unknown mode: {mode}")
+        if days is None:
+            days = REFRESH_DAYS
+        always_backup_requested = repartition = False
     
-    if not clickup_token:
+    # Validate required environment variables
+    if not cfg.clickup_token:
         logger.error("CLICKUP_TOKEN environment variable is required")
-        sys.exit(1)
+        raise ValueError("CLICKUP_TOKEN environment variable is required")
     
-    if not team_id:
+    if not cfg.team_id:
         logger.error("TEAM_ID environment variable is required")
-        sys.exit(1)
+        raise ValueError("TEAM_ID environment variable is required")
     
-    # Parse assignees
-    assignees = [a.strip() for a in assignees_str.split(',') if a.strip()] if assignees_str else []
+    def report(phase: str, pct: float) -> None:
+        if progress_callback is not None:
+            progress_callback(phase, round(pct, 3))
     
-    logger.info(f"Starting ClickUp data pipeline in {args.mode} mode")
-    logger.info(f"Project: {args.project_id}, Dataset: {args.dataset}")
-    logger.info(f"Staging table: {args.staging_table}, Fact table: {args.fact_table}")
+    logger.info(f"Starting ClickUp data pipeline in {mode} mode")
+    logger.info(f"Project: {cfg.project_id}, Dataset: {cfg.dataset}")
+    # A fresh staging table per run, so concurrent refresh and full reindex
+    # runs never load into (or MERGE from) each other's rows
+    staging_table = f"{cfg.staging_table}_{uuid.uuid4().hex[:12]}"
+    logger.info(f"Staging table: {staging_table}, Fact table: {cfg.fact_table}")
     
+    cache = None
     try:
         # Initialize components
-        fetcher = ClickUpDataFetcher(clickup_token, team_id, assignees)
+        cache = ClickUpCache(cfg.cache_path) if cfg.cache_path else None
+        fetcher = ClickUpDataFetcher(cfg.clickup_token, cfg.team_id, list(cfg.assignees),
+                                     session=session, cache=cache)
         transformer = DataTransformer()
-        bq_manager = BigQueryManager(args.project_id, args.dataset, args.staging_table, args.fact_table)
+        bq_manager = BigQueryManager(cfg.project_id, cfg.dataset, staging_table, cfg.fact_table)
         
         # Determine date range
         end_date = datetime.now(timezone.utc)
         
-        if args.mode == 'refresh':
-            start_date = end_date - timedelta(days=args.days)
-            logger.info(f"Refresh mode: fetching last {args.days} days")
+        if mode == 'refresh':
+            # Start at Oslo midnight of the first day in the MERGE window, which is
+            # by Oslo date; this is also stable within a day for the cache keys
+            start_date = refresh_window_start(days, end_date)
+            logger.info(f"Refresh mode: fetching last {days} days")
         else:  # full_reindex
             start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
             logger.info("Full reindex mode: fetching all data since 2024-01-01")
+            
+            # Refresh the dimension tables alongside, since reports join against them
+            logger.info("Syncing dimension tables...")
+            report('sync_dimensions', 0.0)
+            try:
+                sync_all_dimensions(cfg, fetcher.session, dimension_locks)
+            except Exception as e:
+                logger.error(f"Continuing with time entries after dimension sync failure: {e}")
         
         logger.info(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
         
         # Fetch data
         logger.info("Fetching time entries from ClickUp...")
-        raw_entries = fetcher.fetch_all_time_entries(start_date, end_date)
-        
-        if not raw_entries:
-            logger.warning("No time entries found")
-            return
+        report('fetch_time_entries', 0.0)
+        with fetcher:
+            raw_entries = fetcher.fetch_all_time_entries(
+                start_date, end_date,
+                progress_callback=lambda fraction: report('fetch_time_entries', 0.5 * fraction)
+            )
         
         # Transform data
         logger.info("Transforming data...")
-        transformed_entries = [transformer.transform_time_entry(entry) for entry in raw_entries]
-        
-        # Create DataFrame
-        df = pd.DataFrame(transformed_entries)
-        
-        # Remove duplicates (keep latest by 'at' timestamp)
-        if 'at' in df.columns and not df['at'].isna().all():
-            df = df.sort_values('at', na_position='last').drop_duplicates(subset=['id'], keep='last')
-            logger.info(f"Removed duplicates, {len(df)} unique entries remaining")
-        
-        # Save CSV for backup
-        csv_filename = f"clickup_time_entries_{args.mode}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(csv_filename, index=False)
-        logger.info(f"Saved {len(df)} entries to {csv_filename}")
-        
-        # BigQuery operations
-        logger.info("Setting up BigQuery...")
-        bq_manager.ensure_dataset_exists()
-        bq_manager.create_staging_table(df)
-        bq_manager.create_fact_table_if_not_exists()
-        
-        logger.info("Uploading to staging table...")
-        bq_manager.upload_to_staging(df)
-        
-        logger.info("Executing MERGE operation...")
-        if args.mode == 'refresh':
-            bq_manager.merge_refresh_mode(args.days)
+        report('transform', 0.5)
+        if raw_entries:
+            try:
+                df = transformer.transform_time_entries(raw_entries)
+            except Exception as e:
+                # Fall back to the per-entry transform, which tolerates malformed rows
+                logger.warning(f"Vectorized transform failed ({e}); transforming entries one by one")
+                df = transformer.transform_time_entries_rowwise(raw_entries)
+            
+            # Convert once to an Arrow table typed to match BigQuery
+            table = pa.Table.from_pandas(df, schema=arrow_schema(STAGING_SCHEMA), preserve_index=False)
+            del df
+        else:
+            table = arrow_schema(STAGING_SCHEMA).empty_table()
+        del raw_entries
+        
+        if table.num_rows == 0:
+            if mode == 'full_reindex':
+                # The MERGE would delete every fact row
+                logger.error("No time entries found; aborting the full reindex")
+                raise RuntimeError("Full reindex fetched no time entries; the fact table was left unchanged")
+            # Every chunk was fetched without error (fetch_all_time_entries
+            # raises otherwise), so the window really is empty: still MERGE the
+            # empty staging table, so entries deleted in ClickUp inside the
+            # window are removed from the fact table
+            logger.warning("No time entries found; merging an empty refresh window")
+        
+        # By default no backup is written on the happy path: the staging Parquet
+        # is a temporary file that is kept in BACKUP_DIR only if BigQuery fails.
+        # --always_backup writes the --backup format on every run instead.
+        backup_prefix = f"clickup_time_entries_{mode}"
+        always_backup = always_backup_requested and cfg.backup_format != 'none'
+        parquet_is_backup = always_backup and cfg.backup_format == 'parquet'
+        if parquet_is_backup:
+            parquet_filename = backup_filename(backup_prefix, cfg.backup_format, cfg.backup_dir)
         else:
-            bq_manager.merge_full_reindex_mode()
+            fd, parquet_filename = tempfile.mkstemp(suffix='.parquet')
+            os.close(fd)
+        pq.write_table(table, parquet_filename, compression='snappy', row_group_size=PARQUET_ROW_GROUP_SIZE)
+        if parquet_is_backup:
+            logger.info(f"Saved {table.num_rows} entries to {parquet_filename}")
+        
+        def write_csv_backup() -> str:
+            csv_filename = backup_filename(backup_prefix, cfg.backup_format, cfg.backup_dir)
+            # Arrow's multi-threaded CSV writer, straight from the table already built
+            with pa.CompressedOutputStream(csv_filename, 'gzip') as csv_stream:
+                pa_csv.write_csv(table, csv_stream, write_options=pa_csv.WriteOptions(include_header=True))
+            return csv_filename
+        
+        # A CSV backup is written on a side thread while BigQuery does the network-bound work
+        with ThreadPoolExecutor(max_workers=1) as backup_executor:
+            write_csv = always_backup and cfg.backup_format == 'csv'
+            csv_backup = backup_executor.submit(write_csv_backup) if write_csv else None
+            try:
+                # BigQuery operations
+                logger.info("Setting up BigQuery...")
+                report('bigquery_setup', 0.6)
+                bq_manager.ensure_dataset_exists()
+                # The two tables are independent once the dataset exists, so
+                # overlap their round trips on the shared (thread-safe) client
+                with ThreadPoolExecutor(max_workers=2) as table_executor:
+                    staging_ready = table_executor.submit(bq_manager.create_staging_table)
+                    fact_ready = table_executor.submit(bq_manager.create_fact_table_if_not_exists)
+                    staging_ready.result()
+                    fact_ready.result()
+                if repartition:
+                    bq_manager.repartition_fact_table()
+                
+                report('upload', 0.7)
+                # An empty window needs no load; the new staging table is already empty
+                if table.num_rows:
+                    logger.info("Uploading to staging table...")
+                    bq_manager.upload_to_staging(parquet_filename, cfg.gcs_bucket)
+                
+                logger.info("Executing MERGE operation...")
+                report('merge', 0.85)
+                if mode == 'refresh':
+                    bq_manager.merge_refresh_mode(days)
+                else:
+                    bq_manager.merge_full_reindex_mode()
+            except Exception:
+                if not parquet_is_backup and cfg.backup_format != 'none':
+                    # A failed move (disk full, unusable BACKUP_DIR) must not mask the BigQuery error
+                    try:
+                        failed_filename = backup_filename(backup_prefix, 'parquet', cfg.backup_dir)
+                        shutil.move(parquet_filename, failed_filename)
+                        logger.info(f"Kept {table.num_rows} entries from the failed run in {failed_filename}")
+                    except Exception as move_error:
+                        logger.error(f"Could not keep the failed run's entries in {cfg.backup_dir}: {move_error}")
+                raise
+            finally:
+                bq_manager.drop_staging_table()
+                if not parquet_is_backup and os.path.exists(parquet_filename):
+                    os.remove(parquet_filename)
+            
+            if csv_backup is not None:
+                logger.info(f"Saved {table.num_rows} entries to {csv_backup.result()}")
         
         logger.info("Pipeline completed successfully!")
+        report('done', 1.0)
         
     except Exception as e:
         logger.error(f"Pipeline failed: {e}")
-        sys.exit(1)
+        raise
+    finally:
+        # Closed on failure too, so a failed run doesn't hold the SQLite file open
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    except Exception:
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for the Cloud Run service.
+
+Handlers mostly wait on ClickUp and BigQuery, so one process with a pool
+of threads is enough. Keep a single worker: sync jobs and their status
+live in that process's memory (see main.py).
+"""
+
+import os
+
+bind = f":{os.environ.get('PORT', '8080')}"
+workers = 1
+worker_class = "gthread"
+threads = 8
+
+# Dimension syncs still run inside the request
+timeout = 900
+# Cloud Run sends SIGKILL about 10s after SIGTERM, so a stop cuts off in-flight
+# dimension syncs and any background time entry job regardless (gunicorn's
+# graceful shutdown doesn't wait for the job executor). Exit within that window.
+graceful_timeout = 8
+# Longer than the Cloud Run frontend's idle timeout so it can reuse connections
+keepalive = 75
@@ -4,10 +4,18 @@ Flask wrapper for Cloud Run deployment.
 Provides HTTP endpoints for ClickUp to BigQuery sync operations.
 """
 
+import hashlib
+import json
 import os
-import sys
-from flask import Flask, request, jsonify
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+from flask import Flask, Response, g, request, jsonify, stream_with_context, url_for
+from werkzeug.exceptions import HTTPException
 import logging
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -17,80 +25,384 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# Compact, unsorted JSON responses; routes match with or without a trailing
+# slash (set before any route is registered)
+app.json.compact = True
+app.json.sort_keys = False
+app.url_map.strict_slashes = False
 
+# Comma-separated sync endpoints this instance serves, e.g.
+# "refresh,full_reindex" or "daily,accounts,apps"; "all" (default) serves every one
+SYNC_ROUTES = {name.strip() for name in (os.environ.get('SYNC_ROUTES') or 'all').split(',') if name.strip()}
+SYNC_ROUTE_NAMES = ('refresh', 'full_reindex', 'daily', 'lists', 'tasks', 'accounts', 'apps')
 
-@app.route('/sync/refresh', methods=['POST'])
-def sync_refresh():
+
+def sync_enabled(name: str) -> bool:
+    """Whether SYNC_ROUTES enables the named sync endpoint."""
+    return 'all' in SYNC_ROUTES or name in SYNC_ROUTES
+
+
+def sync_route(rule: str, *names: str, **options: Any):
+    """Like app.route, but only registers the view if SYNC_ROUTES enables one of names."""
+    def decorator(view):
+        if any(sync_enabled(name) for name in names):
+            app.add_url_rule(rule, view_func=view, **options)
+        return view
+    return decorator
+
+
+SERVES_SYNCS = any(sync_enabled(name) for name in SYNC_ROUTE_NAMES)
+
+# The pipeline pulls in BigQuery, pandas and pyarrow, so an instance serving
+# no sync endpoints (e.g. SYNC_ROUTES=none) doesn't import it at all
+if SERVES_SYNCS:
+    from fetch_clickup_data import (
+        HIERARCHY_CACHE,
+        Config,
+        get_bigquery_client,
+        main as run_pipeline,
+        new_clickup_session,
+        run_refresh,
+        sync_accounts_to_bigquery,
+        sync_apps_to_bigquery,
+        sync_lists_and_tasks,
+        sync_lists_to_bigquery,
+        sync_tasks_to_bigquery
+    )
+    
+    # Settings are read from the environment once, at startup, and passed to
+    # every sync
+    CFG = Config.from_env()
+    
+    # One pooled, retrying ClickUp session for the whole process, so every sync
+    # reuses kept-alive TLS connections instead of opening its own
+    app.config['HTTP'] = new_clickup_session()
+
+
+def _warm_up() -> None:
     """
-    Refresh mode - sync last 60 days.
+    Pay the pipeline's startup costs when the container starts.
     
-    This endpoint runs the pipeline in refresh mode, fetching only
-    the most recent data (last 60 days) and using windowed delete
-    in BigQuery to update only recent records.
+    The pipeline imports pyarrow.parquet lazily and creates the BigQuery
+    client on first use; doing both here keeps them off the first sync.
     """
+    import pyarrow.parquet  # noqa: F401
+    
     try:
-        logger.info("Starting refresh sync (60 days)...")
-        
-        # Set CLI arguments programmatically
-        sys.argv = ['fetch_clickup_data.py', '--mode', 'refresh', '--days', '60']
-        
-        # Import and run main function
-        from fetch_clickup_data import main
-        main()
-        
-        logger.info("Refresh sync completed successfully")
-        return jsonify({
-            'status': 'success',
-            'mode': 'refresh',
-            'days': 60,
-            'message': 'ClickUp refresh sync completed successfully'
-        }), 200
-        
+        get_bigquery_client(CFG.project_id)
     except Exception as e:
-        logger.error(f"Refresh sync failed: {e}", exc_info=True)
-        return jsonify({
-            'status': 'error',
-            'mode': 'refresh',
-            'error': str(e)
-        }), 500
+        # Syncs create it on first use instead, and fail there with the real error
+        logger.warning(f"Could not create BigQuery client at startup: {e}")
+
+
+if SERVES_SYNCS:
+    _warm_up()
+
+
+@app.before_request
+def _start_timer():
+    g.start = time.monotonic()
+
+
+@app.after_request
+def _log_duration(response):
+    start = g.get('start')
+    if start is not None:
+        logger.info(f"{request.method} {request.path} -> {response.status_code} in {time.monotonic() - start:.3f}s")
+    return response
+
+
+@app.errorhandler(Exception)
+def handle_error(e):
+    """Log any unhandled error and return the JSON error envelope."""
+    if isinstance(e, HTTPException):
+        return e
+    
+    logger.error(f"{request.method} {request.path} failed: {e}", exc_info=e)
+    return jsonify({
+        'status': 'error',
+        # Views are named sync_<mode>; the path can end in a slash or a job id
+        'mode': (request.endpoint or '').removeprefix('sync_'),
+        'error': str(e)
+    }), 500
+
+
+# Time entry pipelines run here so the request returns immediately; two workers
+# let a refresh proceed while a full reindex is still running
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sync')
+MAX_FINISHED_JOBS = 100
+# job_id -> {'mode', 'future', 'phase', 'pct'}
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+# ?stream=1 responses check the job this often and send an unchanged status
+# again after the heartbeat interval so proxies don't drop the idle connection
+STREAM_POLL_SECONDS = 1.0
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+# Held while a sync of that kind is in flight, so a second request gets 409
+# instead of doubling the ClickUp and BigQuery load. Per instance only.
+_running = {
+    kind: threading.Lock()
+    for kind in ('refresh', 'full_reindex', 'lists', 'tasks', 'accounts', 'apps')
+}
+
+
+# Minimum seconds between starts of the same job kind, so a misconfigured
+# scheduler can't hammer ClickUp; busy locks already stop overlapping runs.
+# A job that fails clears its start, so it can be retried right away.
+MIN_JOB_INTERVAL = {
+    'refresh': 60,
+    'full_reindex': 3600
+}
+_last_started: Dict[str, float] = {}
+
+
+def _retry_after(kind: str) -> float:
+    """Seconds until a job of this kind may start again (0 if it may start now)."""
+    last = _last_started.get(kind)
+    if last is None:
+        return 0.0
+    return max(0.0, last + MIN_JOB_INTERVAL.get(kind, 0) - time.monotonic())
+
+
+def _rate_limited_response(kind: str, retry_after: float):
+    """429 response for a job started again too soon."""
+    logger.warning(f"Rejected {kind} sync: started less than {MIN_JOB_INTERVAL[kind]}s ago")
+    response = jsonify({
+        'status': 'rate_limited',
+        'mode': kind,
+        'error': f'A {kind} sync may start at most once every {MIN_JOB_INTERVAL[kind]}s'
+    })
+    response.headers['Retry-After'] = str(int(retry_after) + 1)
+    return response, 429
+
+
+def _busy_response(kind: str):
+    """409 response for a sync that is already running."""
+    logger.warning(f"Rejected {kind} sync: one is already running")
+    return jsonify({
+        'status': 'busy',
+        'mode': kind,
+        'error': f'A {kind} sync is already running'
+    }), 409
+
+
+def _finish_job(job_id: str, kind: str, future: Future) -> None:
+    """Release the job's mode lock and log how it ended."""
+    error = future.exception()
+    if error is not None:
+        _last_started.pop(kind, None)
+    _running[kind].release()
+    
+    if error is not None:
+        logger.error(f"Job {job_id} ({kind}) failed: {error}", exc_info=error)
+    else:
+        logger.info(f"Job {job_id} ({kind}) completed successfully")
+
+
+def _submit_job(kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Optional[str]:
+    """
+    Queue fn(*args, progress_callback=..., **kwargs) on the background executor.
+    
+    fn reports (phase, pct) through progress_callback, which is recorded
+    on the job for /sync/status.
+    
+    Returns:
+        Job ID to poll with GET /sync/status/<job_id>, or None if a job
+        of the same kind is still running
+    """
+    if not _running[kind].acquire(blocking=False):
+        return None
+    _last_started[kind] = time.monotonic()
+    
+    job_id = uuid.uuid4().hex
+    job = {'mode': kind, 'phase': 'queued', 'pct': 0.0}
+    
+    def record_progress(phase: str, pct: float) -> None:
+        with _jobs_lock:
+            job['phase'], job['pct'] = phase, pct
+    
+    try:
+        with _jobs_lock:
+            # Forget the oldest finished jobs so the registry doesn't grow forever
+            finished = [jid for jid, j in _jobs.items() if j['future'].done()]
+            for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS + 1)]:
+                del _jobs[jid]
+            
+            future = executor.submit(fn, *args, progress_callback=record_progress, **kwargs)
+            job['future'] = future
+            _jobs[job_id] = job
+    except Exception:
+        _last_started.pop(kind, None)
+        _running[kind].release()
+        raise
+    
+    future.add_done_callback(lambda f: _finish_job(job_id, kind, f))
+    return job_id
 
 
-@app.route('/sync/full_reindex', methods=['POST'])
+def _job_status(job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Status body for a job; call with _jobs_lock held."""
+    future = job['future']
+    body = {'job_id': job_id, 'mode': job['mode'], 'phase': job['phase'], 'pct': job['pct']}
+    if not future.done():
+        body['status'] = 'running'
+    elif future.exception() is not None:
+        body['status'] = 'error'
+        body['error'] = str(future.exception())
+    else:
+        body['status'] = 'success'
+        if future.result() is not None:
+            body['result'] = future.result()
+    return body
+
+
+def _stream_job(job_id: str) -> Iterator[str]:
+    """Yield the job's status as JSON lines whenever it changes, until it finishes."""
+    last_body, last_sent = None, 0.0
+    while True:
+        with _jobs_lock:
+            job = _jobs.get(job_id)
+            body = _job_status(job_id, job) if job is not None else None
+        if body is None:
+            return
+        
+        now = time.monotonic()
+        if body != last_body or now - last_sent >= STREAM_HEARTBEAT_SECONDS:
+            yield json.dumps(body) + '\n'
+            last_body, last_sent = body, now
+        if body['status'] != 'running':
+            return
+        time.sleep(STREAM_POLL_SECONDS)
+
+
+def _query_flag(name: str) -> bool:
+    """Whether a boolean query parameter such as ?stream=1 is set."""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _stream_response(job_id: str) -> Response:
+    """Chunked application/x-ndjson response following a job to completion."""
+    return Response(stream_with_context(_stream_job(job_id)), mimetype='application/x-ndjson')
+
+
+@sync_route('/sync/refresh', 'refresh', methods=['POST'])
+def sync_refresh():
+    """
+    Refresh mode - sync recent time entries.
+    
+    This endpoint queues the pipeline in refresh mode, fetching only
+    the most recent data (last 60 days) and using windowed delete
+    in BigQuery to update only recent records. With SYNC_STATE_BUCKET
+    set, only the days since the last successful refresh are synced,
+    with the full 60 days reconciled weekly or on ?reconcile=1.
+    Returns 202 with a job ID to poll at /sync/status/<job_id>, or
+    with ?stream=1 streams the job's progress as JSON lines until it
+    finishes.
+    """
+    # A running sync answers 409 busy, not 429
+    if _running['refresh'].locked():
+        return _busy_response('refresh')
+    retry_after = _retry_after('refresh')
+    if retry_after:
+        return _rate_limited_response('refresh', retry_after)
+    
+    reconcile = _query_flag('reconcile')
+    logger.info(f"Queueing refresh sync{' (reconcile)' if reconcile else ''}...")
+    job_id = _submit_job('refresh', run_refresh, reconcile, session=app.config['HTTP'], cfg=CFG)
+    if job_id is None:
+        return _busy_response('refresh')
+    if _query_flag('stream'):
+        return _stream_response(job_id)
+    
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('sync_status', job_id=job_id),
+        'status': 'accepted',
+        'mode': 'refresh',
+        'reconcile': reconcile
+    }), 202
+
+
+@sync_route('/sync/full_reindex', 'full_reindex', methods=['POST'])
 def sync_full_reindex():
     """
     Full reindex mode - sync all data since 2024.
     
-    This endpoint runs the pipeline in full reindex mode, fetching
+    This endpoint queues the pipeline in full reindex mode, fetching
     all historical data from January 2024 to present and performing
-    a complete replacement of the BigQuery fact table.
+    a complete replacement of the BigQuery fact table. Returns 202
+    with a job ID to poll at /sync/status/<job_id>, or with ?stream=1
+    streams the job's progress as JSON lines until it finishes.
     """
-    try:
-        logger.info("Starting full reindex...")
-        
-        # Set CLI arguments programmatically
-        sys.argv = ['fetch_clickup_data.py', '--mode', 'full_reindex']
-        
-        # Import and run main function
-        from fetch_clickup_data import main
-        main()
-        
-        logger.info("Full reindex completed successfully")
-        return jsonify({
-            'status': 'success',
-            'mode': 'full_reindex',
-            'message': 'ClickUp full reindex completed successfully'
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Full reindex failed: {e}", exc_info=True)
+    # A running sync answers 409 busy, not 429
+    if _running['full_reindex'].locked():
+        return _busy_response('full_reindex')
+    retry_after = _retry_after('full_reindex')
+    if retry_after:
+        return _rate_limited_response('full_reindex', retry_after)
+    
+    logger.info("Queueing full reindex...")
+    # The reindex's dimension syncs take the lists/tasks/accounts/apps locks too
+    job_id = _submit_job('full_reindex', run_pipeline, 'full_reindex', session=app.config['HTTP'], cfg=CFG,
+                         dimension_locks=_running)
+    if job_id is None:
+        return _busy_response('full_reindex')
+    if _query_flag('stream'):
+        return _stream_response(job_id)
+    
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('sync_status', job_id=job_id),
+        'status': 'accepted',
+        'mode': 'full_reindex'
+    }), 202
+
+
+@sync_route('/sync/status/<job_id>', 'refresh', 'full_reindex', methods=['GET'])
+def sync_status(job_id):
+    """
+    Status of a queued sync job.
+    
+    Reports 'running', 'success' or 'error' (with the error message),
+    plus the current phase and pct, for a job ID returned by
+    /sync/refresh or /sync/full_reindex. With ?stream=1 the status is
+    streamed as JSON lines until the job finishes.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        body = _job_status(job_id, job) if job is not None else None
+    
+    if body is None:
         return jsonify({
             'status': 'error',
-            'mode': 'full_reindex',
-            'error': str(e)
-        }), 500
+            'job_id': job_id,
+            'error': 'Unknown job ID'
+        }), 404
+    
+    if _query_flag('stream'):
+        return _stream_response(job_id)
+    return jsonify(body), 200
+
+
+@sync_route('/sync/cache/clear', 'daily', 'lists', 'tasks', methods=['POST'])
+def clear_cache():
+    """
+    Clear the cached ClickUp folder/list hierarchy.
+    
+    The lists and tasks syncs reuse folder (1 hour) and list (15 minutes)
+    responses; call this after restructuring ClickUp to fetch them fresh.
+    """
+    cleared = HIERARCHY_CACHE.clear()
+    logger.info(f"Cleared {cleared} cached hierarchy responses")
+    return jsonify({
+        'status': 'success',
+        'cleared': cleared
+    }), 200
 
 
-@app.route('/sync/lists', methods=['POST'])
+@sync_route('/sync/lists', 'lists', methods=['POST'])
 def sync_lists():
     """
     Sync ClickUp lists to BigQuery.
@@ -98,28 +410,53 @@ def sync_lists():
     This endpoint fetches all ClickUp lists (Space → Folder → List hierarchy)
     and uploads them to BigQuery, replacing all existing data.
     """
+    if not _running['lists'].acquire(blocking=False):
+        return _busy_response('lists')
+    
     try:
         logger.info("Starting lists sync...")
         
-        # Import and run sync function
-        from fetch_clickup_data import sync_lists_to_bigquery
-        sync_lists_to_bigquery()
-        
-        logger.info("Lists sync completed successfully")
-        return jsonify({
-            'status': 'success',
-            'message': 'ClickUp lists sync completed successfully'
-        }), 200
+        sync_lists_to_bigquery(cfg=CFG, session=app.config['HTTP'])
+    finally:
+        _running['lists'].release()
+    
+    logger.info("Lists sync completed successfully")
+    return jsonify({
+        'status': 'success',
+        'message': 'ClickUp lists sync completed successfully'
+    }), 200
+
+
+@sync_route('/sync/daily', 'daily', methods=['POST'])
+def sync_daily():
+    """
+    Sync ClickUp lists, then tasks, in one request.
+    
+    The tasks sync reuses the folder/list hierarchy the lists sync just
+    fetched, so the daily schedule walks it once instead of twice.
+    """
+    if not _running['lists'].acquire(blocking=False):
+        return _busy_response('lists')
+    if not _running['tasks'].acquire(blocking=False):
+        _running['lists'].release()
+        return _busy_response('tasks')
+    
+    try:
+        logger.info("Starting daily lists and tasks sync...")
         
-    except Exception as e:
-        logger.error(f"Lists sync failed: {e}", exc_info=True)
-        return jsonify({
-            'status': 'error',
-            'error': str(e)
-        }), 500
+        sync_lists_and_tasks(cfg=CFG, session=app.config['HTTP'])
+    finally:
+        _running['tasks'].release()
+        _running['lists'].release()
+    
+    logger.info("Daily lists and tasks sync completed successfully")
+    return jsonify({
+        'status': 'success',
+        'message': 'ClickUp lists and tasks sync completed successfully'
+    }), 200
 
 
-@app.route('/sync/tasks', methods=['POST'])
+@sync_route('/sync/tasks', 'tasks', methods=['POST'])
 def sync_tasks():
     """
     Sync ClickUp tasks to BigQuery.
@@ -127,28 +464,24 @@ def sync_tasks():
     This endpoint fetches ALL tasks (open, closed, archived, subtasks) from 
     the configured ClickUp space and uploads them to BigQuery.
     """
+    if not _running['tasks'].acquire(blocking=False):
+        return _busy_response('tasks')
+    
     try:
         logger.info("Starting tasks sync...")
         
-        # Import and run sync function
-        from fetch_clickup_data import sync_tasks_to_bigquery
-        sync_tasks_to_bigquery()
-        
-        logger.info("Tasks sync completed successfully")
-        return jsonify({
-            'status': 'success',
-            'message': 'ClickUp tasks sync completed successfully'
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Tasks sync failed: {e}", exc_info=True)
-        return jsonify({
-            'status': 'error',
-            'error': str(e)
-        }), 500
+        sync_tasks_to_bigquery(cfg=CFG, session=app.config['HTTP'])
+    finally:
+        _running['tasks'].release()
+    
+    logger.info("Tasks sync completed successfully")
+    return jsonify({
+        'status': 'success',
+        'message': 'ClickUp tasks sync completed successfully'
+    }), 200
 
 
-@app.route('/sync/accounts', methods=['POST'])
+@sync_route('/sync/accounts', 'accounts', methods=['POST'])
 def sync_accounts():
     """
     Sync ClickUp accounts to BigQuery.
@@ -157,28 +490,24 @@ def sync_accounts():
     with custom fields (Connected List IDs, Hours Discount, ARR) and
     uploads them to BigQuery.
     """
+    if not _running['accounts'].acquire(blocking=False):
+        return _busy_response('accounts')
+    
     try:
         logger.info("Starting accounts sync...")
         
-        # Import and run sync function
-        from fetch_clickup_data import sync_accounts_to_bigquery
-        sync_accounts_to_bigquery()
-        
-        logger.info("Accounts sync completed successfully")
-        return jsonify({
-            'status': 'success',
-            'message': 'ClickUp accounts sync completed successfully'
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Accounts sync failed: {e}", exc_info=True)
-        return jsonify({
-            'status': 'error',
-            'error': str(e)
-        }), 500
+        sync_accounts_to_bigquery(cfg=CFG, session=app.config['HTTP'])
+    finally:
+        _running['accounts'].release()
+    
+    logger.info("Accounts sync completed successfully")
+    return jsonify({
+        'status': 'success',
+        'message': 'ClickUp accounts sync completed successfully'
+    }), 200
 
 
-@app.route('/sync/apps', methods=['POST'])
+@sync_route('/sync/apps', 'apps', methods=['POST'])
 def sync_apps():
     """
     Sync ClickUp applications to BigQuery.
@@ -186,25 +515,148 @@ def sync_apps():
     This endpoint fetches Application tasks (custom_item_id 1005) from team level
     with custom fields (ARR, Last Updated, Maintenance, Account relationships).
     """
+    if not _running['apps'].acquire(blocking=False):
+        return _busy_response('apps')
+    
     try:
         logger.info("Starting applications sync...")
         
-        # Import and run sync function
-        from fetch_clickup_data import sync_apps_to_bigquery
-        sync_apps_to_bigquery()
-        
-        logger.info("Applications sync completed successfully")
-        return jsonify({
-            'status': 'success',
-            'message': 'ClickUp applications sync completed successfully'
-        }), 200
+        sync_apps_to_bigquery(cfg=CFG, session=app.config['HTTP'])
+    finally:
+        _running['apps'].release()
+    
+    logger.info("Applications sync completed successfully")
+    return jsonify({
+        'status': 'success',
+        'message': 'ClickUp applications sync completed successfully'
+    }), 200
+
+
+# The info endpoints never change while the process runs (and /health is
+# polled constantly), so their bodies are serialized once at import
+HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'clickup-bigquery-sync',
+    'version': '2.0.0'
+})
+
+ROOT_INFO = {
+    'service': 'ClickUp to BigQuery Sync Pipeline',
+    'version': '2.0.0',
+    'endpoints': {
+        '/sync/refresh': {
+            'method': 'POST',
+            'description': 'Queue a sync of recent time entries (202 + job_id); incremental with SYNC_STATE_BUCKET, ?reconcile=1 for all 60 days',
+            'use_case': 'Regular scheduled updates'
+        },
+        '/sync/full_reindex': {
+            'method': 'POST',
+            'description': 'Queue a full reindex of time entries since 2024 (202 + job_id)',
+            'use_case': 'Quarterly validation or after data issues'
+        },
+        '/sync/status/<job_id>': {
+            'method': 'GET',
+            'description': 'Status of a queued refresh or full reindex job',
+            'use_case': 'Poll after /sync/refresh or /sync/full_reindex'
+        },
+        '/sync/lists': {
+            'method': 'POST',
+            'description': 'Sync all ClickUp lists (Space → Folder → List hierarchy)',
+            'use_case': 'Update list metadata (run when lists are added/removed/renamed)'
+        },
+        '/sync/daily': {
+            'method': 'POST',
+            'description': 'Sync lists, then tasks, walking the ClickUp hierarchy once',
+            'use_case': 'Daily scheduled dimension update'
+        },
+        '/sync/tasks': {
+            'method': 'POST',
+            'description': 'Sync all ClickUp tasks (open, closed, archived, subtasks)',
+            'use_case': 'Update task metadata (run when tasks change)'
+        },
+        '/sync/accounts': {
+            'method': 'POST',
+            'description': 'Sync ClickUp accounts with custom fields (Connected Lists, Hours Discount, ARR)',
+            'use_case': 'Update account/customer metadata'
+        },
+        '/sync/apps': {
+            'method': 'POST',
+            'description': 'Sync ClickUp applications (custom_item_id 1005) with custom fields',
+            'use_case': 'Update application/software metadata'
+        },
+        '/sync/cache/clear': {
+            'method': 'POST',
+            'description': 'Clear the cached ClickUp folder/list hierarchy',
+            'use_case': 'After adding, moving or renaming folders or lists'
+        },
+        '/health': {
+            'method': 'GET',
+            'description': 'Health check endpoint',
+            'use_case': 'Container health monitoring'
+        }
+    },
+    'schedule': {
+        'refresh': 'Every 6 hours',
+        'full_reindex': 'Quarterly (Jan 1, Apr 1, Jul 1, Oct 1)',
+        'daily': 'Daily at 3:30 AM (Oslo time), lists then tasks',
+        'accounts': 'Daily at 5 AM (Oslo time)',
+        'apps': 'Daily at 6 AM (Oslo time)'
+    }
+}
+# Only list the sync endpoints this instance registered (see SYNC_ROUTES)
+_registered_rules = {rule.rule for rule in app.url_map.iter_rules()}
+ROOT_INFO['endpoints'] = {
+    path: info for path, info in ROOT_INFO['endpoints'].items()
+    if not path.startswith('/sync/') or path in _registered_rules
+}
+ROOT_BODY = orjson.dumps(ROOT_INFO)
+
+HEALTH_ETAG = hashlib.md5(HEALTH_BODY, usedforsecurity=False).hexdigest()
+ROOT_ETAG = hashlib.md5(ROOT_BODY, usedforsecurity=False).hexdigest()
+
+# How long external monitors and proxies may reuse a response: briefly for
+# /health, longer for / whose body only changes on deploy
+HEALTH_MAX_AGE = 30
+ROOT_MAX_AGE = 300
+
+
+def _static_json_response(body: bytes, etag: str, max_age: int) -> Response:
+    """Serve a pre-serialized JSON body with its ETag, answering 304 if the client's copy matches."""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+
+def health_middleware(wsgi_app):
+    """
+    Answer GET /health before Flask sees the request.
+    
+    Probes hit /health far more often than anything else; this skips the
+    request context, URL routing and the after-request hooks for them. Other
+    requests (including HEAD /health) go to Flask as usual.
+    """
+    quoted_etag = f'"{HEALTH_ETAG}"'
+    headers = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(HEALTH_BODY))),
+        ('ETag', quoted_etag),
+        ('Cache-Control', f'public, max-age={HEALTH_MAX_AGE}')
+    ]
+    not_modified_headers = [header for header in headers if header[0] in ('ETag', 'Cache-Control')]
+    
+    def middleware(environ, start_response):
+        if environ.get('PATH_INFO') != '/health' or environ.get('REQUEST_METHOD') != 'GET':
+            return wsgi_app(environ, start_response)
         
-    except Exception as e:
-        logger.error(f"Applications sync failed: {e}", exc_info=True)
-        return jsonify({
-            'status': 'error',
-            'error': str(e)
-        }), 500
+        if quoted_etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', not_modified_headers)
+            return []
+        start_response('200 OK', headers)
+        return [HEALTH_BODY]
+    
+    return middleware
 
 
 @app.route('/health', methods=['GET'])
@@ -215,11 +667,7 @@ def health_check():
     Returns the service status and version information.
     Used by Cloud Run for container health monitoring.
     """
-    return jsonify({
-        'status': 'healthy',
-        'service': 'clickup-bigquery-sync',
-        'version': '2.0.0'
-    }), 200
+    return _static_json_response(HEALTH_BODY, HEALTH_ETAG, HEALTH_MAX_AGE)
 
 
 @app.route('/', methods=['GET'])
@@ -229,55 +677,10 @@ def root():
     
     Returns an overview of available endpoints and their usage.
     """
-    return jsonify({
-        'service': 'ClickUp to BigQuery Sync Pipeline',
-        'version': '2.0.0',
-        'endpoints': {
-            '/sync/refresh': {
-                'method': 'POST',
-                'description': 'Sync last 60 days of time entries',
-                'use_case': 'Regular scheduled updates'
-            },
-            '/sync/full_reindex': {
-                'method': 'POST',
-                'description': 'Full reindex of time entries since 2024',
-                'use_case': 'Quarterly validation or after data issues'
-            },
-            '/sync/lists': {
-                'method': 'POST',
-                'description': 'Sync all ClickUp lists (Space → Folder → List hierarchy)',
-                'use_case': 'Update list metadata (run when lists are added/removed/renamed)'
-            },
-            '/sync/tasks': {
-                'method': 'POST',
-                'description': 'Sync all ClickUp tasks (open, closed, archived, subtasks)',
-                'use_case': 'Update task metadata (run when tasks change)'
-            },
-            '/sync/accounts': {
-                'method': 'POST',
-                'description': 'Sync ClickUp accounts with custom fields (Connected Lists, Hours Discount, ARR)',
-                'use_case': 'Update account/customer metadata'
-            },
-            '/sync/apps': {
-                'method': 'POST',
-                'description': 'Sync ClickUp applications (custom_item_id 1005) with custom fields',
-                'use_case': 'Update application/software metadata'
-            },
-            '/health': {
-                'method': 'GET',
-                'description': 'Health check endpoint',
-                'use_case': 'Container health monitoring'
-            }
-        },
-        'schedule': {
-            'refresh': 'Every 6 hours',
-            'full_reindex': 'Quarterly (Jan 1, Apr 1, Jul 1, Oct 1)',
-            'lists': 'Daily at 3 AM (Oslo time)',
-            'tasks': 'Daily at 4 AM (Oslo time)',
-            'accounts': 'Daily at 5 AM (Oslo time)',
-            'apps': 'Daily at 6 AM (Oslo time)'
-        }
-    }), 200
+    return _static_json_response(ROOT_BODY, ROOT_ETAG, ROOT_MAX_AGE)
+
+
+app.wsgi_app = health_middleware(app.wsgi_app)
 
 
 if __name__ == '__main__':
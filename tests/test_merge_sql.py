@@ -0,0 +1,28 @@
+import re
+import unittest
+
+from fetch_clickup_data import MERGE_FULL_REINDEX_SQL, MERGE_REFRESH_SQL
+
+
+def _clause(sql: str, start: str, end: str) -> str:
+    return re.search(rf"{start}(.*?){end}", sql, re.S).group(1)
+
+
+class MergeSqlTest(unittest.TestCase):
+    def test_refresh_matches_on_id_only(self):
+        on = _clause(MERGE_REFRESH_SQL, r"\bON\b", r"WHEN MATCHED")
+        self.assertEqual(on.strip(), "T.id = S.id")
+
+    def test_refresh_delete_is_windowed(self):
+        delete = _clause(MERGE_REFRESH_SQL, r"WHEN NOT MATCHED BY SOURCE", r"THEN\s+DELETE")
+        self.assertIn("T.start_date_oslo BETWEEN", delete)
+
+    def test_full_reindex_matches_on_id_and_deletes_everything_else(self):
+        on = _clause(MERGE_FULL_REINDEX_SQL, r"\bON\b", r"WHEN MATCHED")
+        self.assertEqual(on.strip(), "T.id = S.id")
+        delete = _clause(MERGE_FULL_REINDEX_SQL, r"WHEN NOT MATCHED BY SOURCE", r"THEN\s+DELETE")
+        self.assertEqual(delete.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import sys
+import threading
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+import requests
+
+import fetch_clickup_data
+from fetch_clickup_data import (
+    BigQueryManager,
+    ClickUpDataFetcher,
+    Config,
+    main,
+    run_refresh,
+    sync_all_dimensions,
+)
+
+
+def _config() -> Config:
+    return replace(Config.from_env(), clickup_token='token', team_id='1', assignees=(),
+                   backup_format='none', cache_path=None, state_bucket=None)
+
+
+class RefreshPipelineTest(unittest.TestCase):
+    def setUp(self):
+        for target, name in [
+            (fetch_clickup_data, 'get_bigquery_client'),
+            (BigQueryManager, 'ensure_dataset_exists'),
+            (BigQueryManager, 'create_staging_table'),
+            (BigQueryManager, 'create_fact_table_if_not_exists'),
+            (BigQueryManager, 'upload_to_staging'),
+            (BigQueryManager, 'drop_staging_table'),
+        ]:
+            mock.patch.object(target, name).start()
+        self.merge = mock.patch.object(BigQueryManager, 'merge_refresh_mode').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_failed_chunks_abort_before_merge(self):
+        error = requests.exceptions.HTTPError('401 Client Error: Unauthorized')
+        with mock.patch.object(ClickUpDataFetcher, '_make_request', side_effect=error):
+            with self.assertRaises(RuntimeError):
+                main(mode='refresh', days=60, cfg=_config())
+        self.merge.assert_not_called()
+
+    def test_empty_window_still_merges(self):
+        with mock.patch.object(ClickUpDataFetcher, '_make_request', return_value={'data': []}):
+            main(mode='refresh', days=1, cfg=_config())
+        self.merge.assert_called_once_with(1)
+
+
+class RunRefreshStateTest(unittest.TestCase):
+    def setUp(self):
+        # The GCS client is replaced, so no bucket is touched
+        storage = mock.MagicMock()
+        self.blob = storage.Client.return_value.bucket.return_value.blob.return_value
+        self.blob.download_as_bytes.return_value = b'{}'
+        patch = mock.patch.dict(sys.modules, {'google.cloud.storage': storage})
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.cfg = replace(_config(), state_bucket='state-bucket')
+
+    def test_failed_run_keeps_state(self):
+        with mock.patch.object(fetch_clickup_data, 'main', side_effect=RuntimeError('chunk failed')):
+            with self.assertRaises(RuntimeError):
+                run_refresh(cfg=self.cfg)
+        self.blob.upload_from_string.assert_not_called()
+
+    def test_successful_run_saves_state(self):
+        with mock.patch.object(fetch_clickup_data, 'main'):
+            self.assertEqual(run_refresh(cfg=self.cfg), fetch_clickup_data.REFRESH_DAYS)
+        self.blob.upload_from_string.assert_called_once()
+
+    def test_reconcile_bypasses_chunk_cache(self):
+        cfg = replace(self.cfg, cache_path='clickup_cache.sqlite')
+        with mock.patch.object(fetch_clickup_data, 'main') as pipeline:
+            run_refresh(reconcile=True, cfg=cfg)
+        self.assertIsNone(pipeline.call_args.kwargs['cfg'].cache_path)
+
+
+class DimensionLocksTest(unittest.TestCase):
+    def test_busy_dimension_is_skipped_and_locks_released(self):
+        ran = []
+        patches = {}
+        for name in ('sync_lists_and_tasks', 'sync_accounts_to_bigquery', 'sync_apps_to_bigquery'):
+            def sync(cfg, session, name=name):
+                ran.append(name)
+            sync.__name__ = name
+            patches[name] = sync
+        locks = {kind: threading.Lock() for kind in ('lists', 'tasks', 'accounts', 'apps')}
+        locks['accounts'].acquire()
+
+        with mock.patch.multiple(fetch_clickup_data, **patches):
+            sync_all_dimensions(_config(), mock.Mock(), locks)
+
+        self.assertEqual(sorted(ran), ['sync_apps_to_bigquery', 'sync_lists_and_tasks'])
+        self.assertTrue(locks['accounts'].locked())
+        self.assertFalse(any(locks[kind].locked() for kind in ('lists', 'tasks', 'apps')))
+
+
+if __name__ == '__main__':
+    unittest.main()
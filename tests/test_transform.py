@@ -0,0 +1,85 @@
+import unittest
+
+import pyarrow as pa
+
+from fetch_clickup_data import STAGING_SCHEMA, DataTransformer, arrow_schema
+
+FULL_ENTRY = {
+    'id': '4001',
+    'start': '1727762400000',
+    'end': '1727766000000',
+    'duration': '3600000',
+    'at': 1727766001000,
+    'billable': True,
+    'description': 'Review',
+    'source': 'clickup',
+    'is_locked': 'false',
+    'approval_id': 77,
+    'task_url': 'https://app.clickup.com/t/abc',
+    'task': {
+        'id': 'abc',
+        'name': 'Support',
+        'custom_type': 1,
+        'custom_id': None,
+        'status': {'status': 'open', 'color': '#fff', 'type': 'open', 'orderindex': '2'},
+    },
+    'user': {
+        'id': 55424762,
+        'username': 'Kari',
+        'email': 'kari@example.com',
+        'color': '#000',
+        'initials': 'K',
+        'profilePicture': 'https://example.com/k.png',
+    },
+    'task_location': {'list_id': 1, 'folder_id': 2, 'space_id': 3},
+}
+
+# Explicit JSON nulls where ClickUp sends them
+NULL_ENTRY = {
+    'id': '4002',
+    'start': '1727762400000',
+    'end': None,
+    'duration': None,
+    'at': None,
+    'billable': None,
+    'description': None,
+    'source': None,
+    'is_locked': None,
+    'approval_id': None,
+    'task_url': None,
+    'task': {'id': None, 'name': None, 'status': {'status': None, 'orderindex': None}},
+    'user': {'id': 88552909, 'username': None, 'email': None, 'profilePicture': None},
+    'task_location': None,
+}
+
+# Keys left out entirely, including whole nested objects
+MISSING_ENTRY = {
+    'id': '4003',
+    'start': '1727762400000',
+    'duration': 1800000,
+}
+
+
+def _rows(df):
+    """Rows as they are loaded into BigQuery."""
+    return pa.Table.from_pandas(df, schema=arrow_schema(STAGING_SCHEMA), preserve_index=False).to_pylist()
+
+
+class TransformEquivalenceTest(unittest.TestCase):
+    def test_vectorized_matches_rowwise(self):
+        entries = [FULL_ENTRY, NULL_ENTRY, MISSING_ENTRY]
+        vectorized = _rows(DataTransformer.transform_time_entries(entries))
+        rowwise = _rows(DataTransformer.transform_time_entries_rowwise(entries))
+        for expected, actual in zip(rowwise, vectorized):
+            self.assertEqual(expected, actual)
+
+    def test_nulls_and_missing_keys_become_empty_strings(self):
+        rows = _rows(DataTransformer.transform_time_entries([NULL_ENTRY, MISSING_ENTRY]))
+        for row in rows:
+            self.assertEqual(row['description'], '')
+            self.assertEqual(row['user_profilePicture'], '')
+            self.assertIsNone(row['user_email_sha256'])
+
+
+if __name__ == '__main__':
+    unittest.main()